@@ -6,7 +6,7 @@ from sqlalchemy.ext.asyncio import async_engine_from_config
 from alembic import context
 from app.core.db import Base
 from app.core.config import settings
-from app.domain.models import student, school, state
+from app.domain.models import student, school, state, album_task
 
 config = context.config
 if config.config_file_name is not None:
@@ -0,0 +1,37 @@
+"""add_album_and_listing_indexes
+
+Revision ID: 023692908e63
+Revises: 0fe605a14863
+Create Date: 2026-10-19 11:40:05.218764
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '023692908e63'
+down_revision = '0fe605a14863'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Album generation and keyset listings: WHERE schnum IN (...) ORDER BY schnum, ser_no(, id).
+    # The INCLUDE columns let the album and roster projections run as index-only scans.
+    op.create_index(
+        'ix_students_schnum_ser_no', 'students', ['schnum', 'ser_no', 'id'], unique=False,
+        postgresql_include=['reg_no', 'cand_name', 'batch', 'photo_path']
+    )
+    # Joins from schools (albums/generate, by-state listings, /students/batches?state_code=)
+    op.create_index(op.f('ix_students_school_id'), 'students', ['school_id'], unique=False)
+    # Schools of a state, returned in schnum order
+    op.create_index('ix_schools_state_schnum', 'schools', ['state', 'schnum'], unique=False)
+    op.execute('ANALYZE students')
+    op.execute('ANALYZE schools')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_schools_state_schnum', table_name='schools')
+    op.drop_index(op.f('ix_students_school_id'), table_name='students')
+    op.drop_index('ix_students_schnum_ser_no', table_name='students')
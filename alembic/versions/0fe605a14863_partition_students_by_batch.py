@@ -0,0 +1,89 @@
+"""partition_students_by_batch
+
+Revision ID: 0fe605a14863
+Revises: bcb096f1ca91
+Create Date: 2026-10-19 09:12:41.530118
+
+"""
+import hashlib
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0fe605a14863'
+down_revision = 'bcb096f1ca91'
+branch_labels = None
+depends_on = None
+
+COLUMNS = ('id, batch, schnum, sch_name, reg_no, ser_no, cand_name, school_id, photo_path, '
+           'created_at, updated_at')
+
+
+def _partition_name(batch: str) -> str:
+    # Kept in sync with app.infra.repositories.sqlalchemy_repositories.batch_partition_name
+    slug = re.sub(r'[^a-z0-9]+', '_', batch.lower()).strip('_')[:36]
+    if slug != batch.lower():
+        slug = f"{slug}_{hashlib.md5(batch.encode('utf-8')).hexdigest()[:8]}"
+    return f"students_b_{slug}"
+
+
+def _create_students_table(name: str, partitioned: bool) -> None:
+    op.create_table(name,
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('batch', sa.String(), nullable=False),
+    sa.Column('schnum', sa.String(), nullable=False),
+    sa.Column('sch_name', sa.String(), nullable=True),
+    sa.Column('reg_no', sa.String(), nullable=False),
+    sa.Column('ser_no', sa.String(), nullable=False),
+    sa.Column('cand_name', sa.String(), nullable=False),
+    sa.Column('school_id', sa.UUID(), nullable=True),
+    sa.Column('photo_path', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['school_id'], ['schools.id'], name=f'{name}_school_id_fkey'),
+    sa.PrimaryKeyConstraint(*(('id', 'batch') if partitioned else ('id',)), name=f'{name}_pkey'),
+    **({'postgresql_partition_by': 'LIST (batch)'} if partitioned else {})
+    )
+
+
+def upgrade() -> None:
+    # Move the existing table aside; index and constraint names are schema-wide
+    op.rename_table('students', 'students_unpartitioned')
+    op.execute('ALTER TABLE students_unpartitioned RENAME CONSTRAINT students_pkey TO students_unpartitioned_pkey')
+    op.drop_index('ix_students_reg_no', table_name='students_unpartitioned')
+    op.drop_index('idx_batch_school_reg', table_name='students_unpartitioned')
+
+    # Unique and primary keys on a partitioned table must include the partition key,
+    # so reg_no is unique within each batch
+    _create_students_table('students', partitioned=True)
+    op.create_index('idx_batch_school_reg', 'students', ['batch', 'schnum', 'reg_no'], unique=False)
+    op.create_index('ix_students_reg_no', 'students', ['reg_no', 'batch'], unique=True)
+    op.execute('CREATE TABLE students_default PARTITION OF students DEFAULT')
+
+    connection = op.get_bind()
+    batches = connection.execute(sa.text('SELECT DISTINCT batch FROM students_unpartitioned')).scalars().all()
+    for batch in batches:
+        literal = "'" + batch.replace("'", "''") + "'"
+        op.execute(f'CREATE TABLE "{_partition_name(batch)}" PARTITION OF students FOR VALUES IN ({literal})')
+
+    op.execute(f'INSERT INTO students ({COLUMNS}) SELECT {COLUMNS} FROM students_unpartitioned')
+    op.drop_table('students_unpartitioned')
+    op.execute('ANALYZE students')
+
+
+def downgrade() -> None:
+    # Fails if the same reg_no was imported under two batches
+    op.rename_table('students', 'students_partitioned')
+    op.execute('ALTER TABLE students_partitioned RENAME CONSTRAINT students_pkey TO students_partitioned_pkey')
+    op.drop_index('ix_students_reg_no', table_name='students_partitioned')
+    op.drop_index('idx_batch_school_reg', table_name='students_partitioned')
+
+    _create_students_table('students', partitioned=False)
+    op.create_index('idx_batch_school_reg', 'students', ['batch', 'schnum', 'reg_no'], unique=False)
+    op.create_index(op.f('ix_students_reg_no'), 'students', ['reg_no'], unique=True)
+
+    op.execute(f'INSERT INTO students ({COLUMNS}) SELECT {COLUMNS} FROM students_partitioned')
+    op.drop_table('students_partitioned')
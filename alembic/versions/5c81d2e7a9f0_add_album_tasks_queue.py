@@ -0,0 +1,55 @@
+"""add_album_tasks_queue
+
+Revision ID: 5c81d2e7a9f0
+Revises: 023692908e63
+Create Date: 2026-10-19 16:05:12.481733
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c81d2e7a9f0'
+down_revision = '023692908e63'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'album_tasks',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('run_id', sa.String(), nullable=False),
+        sa.Column('state_code', sa.String(), nullable=False),
+        sa.Column('batch', sa.String(), nullable=True),
+        sa.Column('schnum', sa.String(), nullable=False),
+        sa.Column('exam_title', sa.String(), nullable=False),
+        sa.Column('output_path', sa.String(), nullable=False),
+        sa.Column('priority', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('status', sa.String(), server_default='pending', nullable=False),
+        sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('lease_owner', sa.String(), nullable=True),
+        sa.Column('lease_expires_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_album_tasks_run_output', 'album_tasks', ['run_id', 'output_path'], unique=True)
+    op.create_index(
+        'ix_album_tasks_pending', 'album_tasks', [sa.text('priority DESC'), 'id'], unique=False,
+        postgresql_where=sa.text("status = 'pending'")
+    )
+    op.create_index(
+        'ix_album_tasks_lease', 'album_tasks', ['lease_expires_at'], unique=False,
+        postgresql_where=sa.text("status = 'running'")
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_album_tasks_lease', table_name='album_tasks')
+    op.drop_index('ix_album_tasks_pending', table_name='album_tasks')
+    op.drop_index('ix_album_tasks_run_output', table_name='album_tasks')
+    op.drop_table('album_tasks')
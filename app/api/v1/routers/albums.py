@@ -1,17 +1,32 @@
 import uuid
+import logging
+import time
 from pathlib import Path
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Request
 from fastapi.responses import FileResponse
 from pydantic import BaseModel
 from typing import Optional
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.core.db import get_db
+from app.core.db import get_db, get_read_db, session_maker_for
 from app.core.config import settings
-from app.domain.models.student import Student
-from app.infra.pdf.generator import PDFGenerator
+from app.core.metrics import QUEUE_DEPTH, time_stage
+from app.core.instrumentation import without_request_stats
+from app.core.profiling import profiled
+from app.core.logging_config import async_job_log
+from app.infra.pdf.generator import PDFGenerator, parse_layout
 from app.infra.pdf.disk_generator import DiskPDFGenerator
-from app.schemas.album_schema import AlbumGenerationToDiskRequest
+from app.infra.pdf.journal import RunJournal, remove_partials
+from app.infra.pdf.render_pool import album_subdir
+from app.infra.pdf import scheduler
+from app.infra.pdf.task_queue import enqueue_albums, queue_status
+from app.infra.repositories.sqlalchemy_repositories import AlbumTaskRepository, StudentRepository
+from app.schemas.album_schema import AlbumGenerationToDiskRequest, AlbumQueueRequest, NationwideAlbumRequest
+
+logger = logging.getLogger(__name__)
+
+# Progress is logged at INFO every this many schools; each school is logged at DEBUG
+PROGRESS_LOG_EVERY = 50
 
 router = APIRouter(prefix="/albums", tags=["albums"])
 
@@ -29,34 +44,33 @@ class GenerateAlbumRequest(BaseModel):
 async def generate_album(
     request: GenerateAlbumRequest,
     background_tasks: BackgroundTasks,
-    session: AsyncSession = Depends(get_db)
+    session: AsyncSession = Depends(get_read_db)
 ):
-    from sqlalchemy.orm import selectinload
-    from app.domain.models.school import School
-    
-    # Build query with eager loading
-    query = select(Student).options(selectinload(Student.school)).join(School, Student.school_id == School.id, isouter=True)
-    
-    if request.state_code:
-        query = query.where(School.state == request.state_code)
-    if request.school_id:
-        query = query.where(Student.school_id == request.school_id)
-    if request.batch:
-        query = query.where(Student.batch == request.batch)
+    try:
+        school_id = uuid.UUID(request.school_id) if request.school_id else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid school_id: {request.school_id}")
+    try:
+        parse_layout(request.layout)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    result = await session.execute(query)
-    students = result.scalars().all()
+    with time_stage("query"):
+        students, schools = await StudentRepository(session).find_album_candidates(
+            request.state_code, request.batch, school_id
+        )
     
     if not students:
         raise HTTPException(status_code=404, detail="No students found")
     
     # Generate filename
     album_id = str(uuid.uuid4())
+    first_school = schools.get(students[0].schnum)
     if request.state_code:
-        state_name = students[0].school.state_name if students[0].school else request.state_code
+        state_name = first_school.state_name if first_school else request.state_code
         filename = f"{state_name}_{album_id}.pdf"
     else:
-        school_name = students[0].school.sch_name if students[0].school else "unknown"
+        school_name = first_school.sch_name if first_school else "unknown"
         batch = request.batch or students[0].batch
         filename = f"{school_name}_{batch}_{album_id}.pdf"
     
@@ -76,6 +90,76 @@ async def generate_album(
     }
 
 
+@router.post("/nationwide", status_code=202)
+async def start_nationwide_generation(
+    request: NationwideAlbumRequest,
+    background_tasks: BackgroundTasks,
+    http_request: Request
+):
+    """
+    Render albums for many states (or "all") in the background on a bounded worker pool.
+    Poll the returned status_url for per-state progress and throughput.
+    """
+    run = scheduler.create_run()
+    background_tasks.add_task(without_request_stats(scheduler.run_nationwide), run, request, session_maker_for(http_request))
+    return {
+        "run_id": run.run_id,
+        "status": run.status,
+        "status_url": f"/api/v1/albums/nationwide/{run.run_id}"
+    }
+
+
+@router.get("/nationwide")
+async def list_nationwide_runs():
+    return [
+        {k: v for k, v in run.snapshot().items() if k != "states"}
+        for run in scheduler.list_runs()
+    ]
+
+
+@router.get("/nationwide/{run_id}")
+async def get_nationwide_run(run_id: str):
+    run = scheduler.get_run(run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Run not found (runs are tracked by the process that started them)")
+    return run.snapshot()
+
+
+@router.post("/queue", status_code=201)
+async def enqueue_album_tasks(
+    request: AlbumQueueRequest,
+    session: AsyncSession = Depends(get_db)
+):
+    """
+    Queue one task per school in the album_tasks table for `python -m app.worker` processes on any
+    number of machines to render into their shared ALBUM_OUTPUT_ROOT.
+    """
+    async with session.begin():
+        run_id, enqueued = await enqueue_albums(session, request)
+    if not enqueued:
+        raise HTTPException(status_code=404, detail="No students found for the requested states and batches")
+    return {
+        "run_id": run_id,
+        "tasks_enqueued": enqueued,
+        "status_url": f"/api/v1/albums/queue/{run_id}"
+    }
+
+
+@router.get("/queue/{run_id}")
+async def get_album_queue_status(run_id: str, session: AsyncSession = Depends(get_db)):
+    status = await queue_status(session, run_id)
+    if not status["total"]:
+        raise HTTPException(status_code=404, detail="Run not found")
+    return status
+
+
+@router.post("/queue/{run_id}/retry-failed")
+async def retry_failed_album_tasks(run_id: str, session: AsyncSession = Depends(get_db)):
+    async with session.begin():
+        requeued = await AlbumTaskRepository(session).requeue_failed(run_id)
+    return {"run_id": run_id, "requeued": requeued}
+
+
 @router.get("/{album_id}/download")
 async def download_album(album_id: str):
     # Find album file
@@ -110,13 +194,20 @@ async def delete_album(album_id: str):
 @router.post("/generate-to-disk")
 async def generate_albums_to_disk(
     request: AlbumGenerationToDiskRequest,
+    # Primary, not the replica: the server-side cursor stays open for the whole run, and on a hot
+    # standby a long-held snapshot gets cancelled by replication conflicts
     session: AsyncSession = Depends(get_db)
 ):
-    from sqlalchemy.orm import selectinload
-    from app.domain.models.school import School
+    job_id = f"generate-to-disk_{request.state_code}_{request.batch or 'all'}_{time.strftime('%Y%m%d-%H%M%S')}"
+    async with async_job_log(job_id) as log_file:
+        result = await _generate_albums_to_disk(request, session)
+    return {**result, "log_file": str(log_file).replace("\\", "/")}
+
+
+async def _generate_albums_to_disk(request: AlbumGenerationToDiskRequest, session: AsyncSession) -> dict:
     from app.domain.models.state import State
     
-    print(f"Starting generate-to-disk for state: {request.state_code}, batch: {request.batch or 'ALL'}")
+    logger.info("Starting generate-to-disk for state %s, batch %s", request.state_code, request.batch or "ALL")
     
     # 1. Fetch State Name
     state_query = select(State).where(State.code == request.state_code)
@@ -124,97 +215,99 @@ async def generate_albums_to_disk(
     state = state_result.scalar_one_or_none()
     state_name = state.state if state else request.state_code
     
-    print(f"Resolved state name: {state_name}")
-    
-    # 2. First, get all school numbers for this state
-    schools_query = select(School.schnum).where(School.state == request.state_code)
-    schools_result = await session.execute(schools_query)
-    state_schnums = [row[0] for row in schools_result.fetchall()]
-    
-    print(f"Found {len(state_schnums)} schools in state {request.state_code}")
-    
-    # 3. Fetch students by schnum (more reliable than school_id foreign key)
-    query = (
-        select(Student)
-        .options(selectinload(Student.school))
-        .where(Student.schnum.in_(state_schnums))
-        .order_by(Student.schnum, Student.ser_no)
-    )
+    logger.info("Resolved state name: %s", state_name)
     
+    # 2. Count the schools up front; students are streamed one school at a time below.
     # Only filter by batch if a specific batch is provided (not "All Batches")
-    if request.batch:
-        query = query.where(Student.batch == request.batch)
-    
-    result = await session.execute(query)
-    students = result.scalars().all()
+    repo = StudentRepository(session)
+    with time_stage("query"):
+        total_schools = await repo.count_album_schools(request.state_code, request.batch)
     
-    print(f"Found {len(students)} students matching criteria.")
+    logger.info("Found %d schools matching criteria", total_schools)
     
-    if not students:
+    if not total_schools:
         batch_info = f" and batch '{request.batch}'" if request.batch else ""
         raise HTTPException(status_code=404, detail=f"No students found for state '{request.state_code}'{batch_info}")
     
-    # 3. Group by school
-    schools_data = {}
-    for student in students:
-        if student.schnum not in schools_data:
-            schools_data[student.schnum] = {
-                "school": student.school,
-                "students": []
-            }
-        schools_data[student.schnum]["students"].append(student)
-    
-    print(f"Grouped students into {len(schools_data)} schools.")
-    
-    # 4. Create Directory
+    # 3. Create Directory
     try:
         base_path = Path(request.save_path)
-        state_dir = base_path / state_name
-        print(f"Creating directory: {state_dir}")
+        state_dir = base_path / album_subdir(state_name, request.batch, request.batch_subdir)
+        logger.info("Creating directory %s", state_dir)
         state_dir.mkdir(parents=True, exist_ok=True)
     except Exception as e:
-        print(f"Error creating directory: {e}")
+        logger.error("Error creating directory under %s: %s", request.save_path, e)
         raise HTTPException(status_code=500, detail=f"Failed to create directory {request.save_path}: {str(e)}")
     
-    # 5. Generate PDFs
+    # 4. Clear partial PDFs from an interrupted run and load its checkpoint journal
+    removed = remove_partials(state_dir)
+    if removed:
+        logger.info("Removed %d stale partial files left by an interrupted run", removed)
+    journal = RunJournal(state_dir, request.batch or "all", {
+        "state_code": request.state_code, "batch": request.batch, "exam_title": request.exam_title,
+    })
+    finished = journal.open(request.resume)
+    if finished:
+        logger.info("Resuming: %d schools already generated", len(finished))
+    
+    # 5. Generate PDFs as each school's students arrive from the cursor
     generator = DiskPDFGenerator()
     files_generated = 0
+    files_skipped = 0
     files_failed = []
     
-    total_schools = len(schools_data)
-    for idx, (schnum, data) in enumerate(schools_data.items()):
-        school = data["school"]
-        school_students = data["students"]
-        
-        output_file = state_dir / f"{schnum}.pdf"
-        print(f"[{idx + 1}/{total_schools}] Generating PDF for school {schnum} ({len(school_students)} students) -> {output_file}")
-        
-        try:
-            generator.generate_school_album(
-                school=school,
-                students=school_students,
-                exam_title=request.exam_title,
-                output_path=str(output_file)
-            )
-            files_generated += 1
-        except Exception as e:
-            import traceback
-            error_detail = traceback.format_exc()
-            print(f"ERROR generating PDF for {schnum}: {e}")
-            print(error_detail)
-            files_failed.append({
-                "schnum": schnum,
-                "school_name": school.sch_name if school else "Unknown",
-                "error": str(e)
-            })
+    queue_depth = QUEUE_DEPTH.labels("album_schools")
+    queue_depth.inc(total_schools)
+    remaining = total_schools
+    idx = 0
+    try:
+        async for schnum, school, school_students in repo.stream_album_groups(request.state_code, request.batch):
+            output_file = state_dir / f"{schnum}.pdf"
+            logger.debug("[%d/%d] Generating PDF for school %s (%d students) -> %s",
+                         idx + 1, total_schools, schnum, len(school_students), output_file)
+            if idx and idx % PROGRESS_LOG_EVERY == 0:
+                logger.info("Progress: %d/%d schools, %d failed", idx, total_schools, len(files_failed))
+            idx += 1
+            
+            try:
+                if schnum in finished:
+                    files_skipped += 1
+                    continue
+                with profiled(f"album_{request.state_code}_{schnum}"):
+                    generator.generate_school_album(
+                        school=school,
+                        students=school_students,
+                        exam_title=request.exam_title,
+                        output_path=str(output_file)
+                    )
+                journal.record(schnum, str(output_file))
+                files_generated += 1
+            except Exception as e:
+                logger.exception("Error generating PDF for school %s", schnum)
+                files_failed.append({
+                    "schnum": schnum,
+                    "school_name": school.sch_name if school else "Unknown",
+                    "error": str(e)
+                })
+            finally:
+                # The count can drift from the stream if an import runs meanwhile; never go below zero
+                if remaining > 0:
+                    queue_depth.dec()
+                    remaining -= 1
+    finally:
+        # Schools never reached (e.g. the cursor failed) must not stay counted as queued
+        if remaining > 0:
+            queue_depth.dec(remaining)
         
-    print(f"Finish! Generated {files_generated} files, {len(files_failed)} failed, in {state_dir}")
+    logger.info("Finished: generated %d files, skipped %d, %d failed, in %s",
+                files_generated, files_skipped, len(files_failed), state_dir)
     
     return {
         "status": "success" if not files_failed else "partial",
         "files_generated": files_generated,
+        "files_skipped": files_skipped,
         "files_failed": len(files_failed),
         "failed_schools": files_failed[:10],  # Return first 10 failed schools for debugging
-        "total_schools": total_schools,
+        "total_schools": idx,
         "output_directory": str(state_dir).replace("\\", "/")
     }
\ No newline at end of file
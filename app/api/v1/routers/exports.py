@@ -0,0 +1,72 @@
+import asyncio
+import os
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from app.core.config import settings
+from app.core.db import session_maker_for
+from app.infra.export.roster_writers import ROSTER_WRITERS
+from app.infra.repositories.sqlalchemy_repositories import StudentRepository
+
+router = APIRouter(prefix="/exports", tags=["exports"])
+
+DEFAULT_COLUMNS = ["reg_no", "ser_no", "cand_name", "batch", "schnum", "sch_name", "state", "has_photo"]
+
+
+@router.get("/students")
+async def export_students(
+    request: Request,
+    state: Optional[str] = None,
+    batch: Optional[str] = None,
+    schnum: Optional[str] = None,
+    format: str = Query("csv", pattern="^(csv|arrow|parquet)$"),
+    columns: Optional[str] = Query(None, description="Comma-separated column names; defaults to a roster layout"),
+):
+    """
+    Stream a student roster as CSV, Arrow IPC or Parquet, written in fixed-size row batches
+    straight from a server-side cursor.
+    `has_photo` is whether a photo path is recorded; `photo_exists` also checks the file on disk (slower).
+    """
+    fields = [c.strip() for c in columns.split(",") if c.strip()] if columns else DEFAULT_COLUMNS
+    available = set(StudentRepository.EXPORT_COLUMNS) | {"photo_exists"}
+    unknown = [c for c in fields if c not in available]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown columns: {', '.join(unknown)}. Available: {', '.join(sorted(available))}")
+    
+    try:
+        writer = ROSTER_WRITERS[format](fields)
+    except ImportError:
+        raise HTTPException(status_code=400, detail=f"Format '{format}' requires pyarrow to be installed")
+    
+    # photo_exists is computed here from photo_path, which is fetched in its place
+    query_fields = ["photo_path" if c == "photo_exists" else c for c in fields]
+    exists_index = fields.index("photo_exists") if "photo_exists" in fields else None
+    
+    session_maker = session_maker_for(request)
+    
+    async def generate():
+        async with session_maker() as session:
+            repo = StudentRepository(session)
+            yield writer.begin()
+            async for rows in repo.stream_export(query_fields, state, batch, schnum, settings.export_batch_size):
+                if exists_index is not None:
+                    rows = await asyncio.to_thread(_with_photo_exists, rows, exists_index)
+                yield writer.write_batch(rows)
+            yield writer.finish()
+    
+    filename = f"students_{state or 'all'}_{batch or 'all'}.{writer.extension}"
+    return StreamingResponse(
+        generate(),
+        media_type=writer.media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+def _with_photo_exists(rows, index: int) -> List[tuple]:
+    """Replace photo_path with whether the file exists, for a whole partition (run in a thread: it stats every photo)."""
+    result = []
+    for row in rows:
+        values = list(row)
+        values[index] = bool(values[index]) and os.path.exists(values[index])
+        result.append(tuple(values))
+    return result
@@ -1,24 +1,95 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from uuid import UUID
-from typing import Optional, List
+from typing import Optional, List, Union
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.schemas.school_schema import SchoolRead, SchoolCreate, SchoolUpdate
+from app.schemas.school_schema import SchoolRead, SchoolCreate, SchoolUpdate, SchoolPage
 from app.domain.repositories.interfaces import ISchoolRepository
+from app.schemas.bulk_schema import BulkRequest, BulkResponse
+from app.domain.commands.bulk_mutation_command import BulkMutationCommand
+from app.domain.commands.handlers.bulk_mutation_handler import BulkMutationHandler
 from app.api.v1.deps import get_school_repo
 from app.core.db import get_db
+from app.core.cache import cached_response, invalidate
+from app.core.serialization import fast_json
+from app.core.config import settings
+from app.core.pagination import encode_cursor, decode_cursor
 
 router = APIRouter(prefix="/schools", tags=["schools"])
 
 
-@router.get("/", response_model=List[SchoolRead])
+@router.get("/", response_model=Union[List[SchoolRead], SchoolPage])
 async def list_schools(
+    request: Request,
     schnum: Optional[str] = None,
     state: Optional[str] = None,
     sch_name: Optional[str] = None,
+    fast: bool = Query(False, description="Project columns in SQL and encode with orjson, skipping model validation"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return, e.g. schnum,sch_name"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Page size; returns a SchoolPage ordered by schnum"),
+    cursor: Optional[str] = Query(None, description="next_cursor from a previous page"),
     repo: ISchoolRepository = Depends(get_school_repo)
 ):
-    schools = await repo.find_all(schnum, state, sch_name)
-    return [SchoolRead.model_validate(school) for school in schools]
+    """
+    Without limit/cursor the full matching list is returned, as before.
+    With them, a SchoolPage of at most `limit` items is returned.
+    """
+    selected = None
+    if fields:
+        selected = [f.strip() for f in fields.split(",") if f.strip()]
+        unknown = [f for f in selected if f not in SchoolRead.model_fields]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    elif fast:
+        selected = list(SchoolRead.model_fields)
+    
+    paginate = limit is not None or cursor is not None
+    if paginate:
+        limit = limit or settings.page_size_default
+        try:
+            after = decode_cursor(cursor, 1)[0] if cursor else None
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    
+    async def build():
+        if not paginate:
+            if selected:
+                rows = await repo.find_all(schnum, state, sch_name, fields=selected)
+                return [row._asdict() for row in rows]
+            schools = await repo.find_all(schnum, state, sch_name)
+            return [SchoolRead.model_validate(school) for school in schools]
+        
+        # schnum is the page key, so it is always selected for pagination
+        query_fields = selected and (selected if "schnum" in selected else selected + ["schnum"])
+        rows = await repo.find_all(schnum, state, sch_name, fields=query_fields, limit=limit + 1, after=after)
+        next_cursor = encode_cursor(rows[limit - 1].schnum) if len(rows) > limit else None
+        rows = rows[:limit]
+        if selected:
+            items = [{name: getattr(row, name) for name in selected} for row in rows]
+        else:
+            items = [SchoolRead.model_validate(school) for school in rows]
+        return SchoolPage(items=items, limit=limit, next_cursor=next_cursor)
+    
+    return await cached_response(request, "schools", build)
+
+
+@router.post("/bulk", response_model=BulkResponse)
+async def bulk_mutate_schools(
+    request: BulkRequest,
+    repo: ISchoolRepository = Depends(get_school_repo),
+    session: AsyncSession = Depends(get_db)
+):
+    """
+    Apply many create/update/delete operations in one call. Operations are applied in chunked
+    transactions with set-based SQL; each item gets its own result in input order.
+    """
+    handler = BulkMutationHandler(session, repo, SchoolCreate, SchoolUpdate, unique_field="schnum")
+    outcomes = await handler.handle(BulkMutationCommand(operations=request.operations))
+    await invalidate("schools")
+    
+    summary = {}
+    for outcome in outcomes:
+        summary[outcome.status] = summary.get(outcome.status, 0) + 1
+    return fast_json({"summary": summary, "results": [vars(outcome) for outcome in outcomes]})
 
 
 @router.get("/{school_id}", response_model=SchoolRead)
@@ -35,11 +106,14 @@ async def get_school(
 @router.post("/", response_model=SchoolRead)
 async def create_school(
     school_data: SchoolCreate,
-    repo: ISchoolRepository = Depends(get_school_repo)
+    repo: ISchoolRepository = Depends(get_school_repo),
+    session: AsyncSession = Depends(get_db)
 ):
     from app.domain.models.school import School
     school = School(**school_data.model_dump())
-    created = await repo.add(school)
+    async with session.begin():
+        created = await repo.add(school)
+    await invalidate("schools")
     return SchoolRead.model_validate(created)
 
 
@@ -47,27 +121,33 @@ async def create_school(
 async def update_school(
     school_id: UUID,
     school_data: SchoolUpdate,
-    repo: ISchoolRepository = Depends(get_school_repo)
+    repo: ISchoolRepository = Depends(get_school_repo),
+    session: AsyncSession = Depends(get_db)
 ):
-    school = await repo.get_by_id(school_id)
-    if not school:
-        raise HTTPException(status_code=404, detail="School not found")
-    
-    for field, value in school_data.model_dump(exclude_unset=True).items():
-        setattr(school, field, value)
-    
-    updated = await repo.update(school)
+    async with session.begin():
+        school = await repo.get_by_id(school_id)
+        if not school:
+            raise HTTPException(status_code=404, detail="School not found")
+        
+        for field, value in school_data.model_dump(exclude_unset=True).items():
+            setattr(school, field, value)
+        
+        updated = await repo.update(school)
+    await invalidate("schools")
     return SchoolRead.model_validate(updated)
 
 
 @router.delete("/{school_id}")
 async def delete_school(
     school_id: UUID,
-    repo: ISchoolRepository = Depends(get_school_repo)
+    repo: ISchoolRepository = Depends(get_school_repo),
+    session: AsyncSession = Depends(get_db)
 ):
-    deleted = await repo.delete_by_id(school_id)
+    async with session.begin():
+        deleted = await repo.delete_by_id(school_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="School not found")
+    await invalidate("schools")
     return {"message": "School deleted"}
 
 
@@ -80,10 +160,8 @@ async def delete_all_schools(
     if not force:
         raise HTTPException(status_code=400, detail="Add ?force=true to confirm deletion")
     
-    from sqlalchemy import delete
-    from app.domain.models.student import Student
-    
+    # Truncates students along with schools, since students reference schools
     async with session.begin():
-        await session.execute(delete(Student))
         count = await repo.delete_all()
+    await invalidate("students", "schools")
     return {"deleted": count}
\ No newline at end of file
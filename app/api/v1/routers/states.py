@@ -1,39 +1,50 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from typing import List
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.schemas.state_schema import StateRead, StateCreate, StateUpdate
 from app.domain.repositories.interfaces import IStateRepository
 from app.api.v1.deps import get_state_repo
 from app.core.db import get_db
+from app.core.cache import cached_response, invalidate
 
 router = APIRouter(prefix="/states", tags=["states"])
 
 
 @router.get("/", response_model=List[StateRead])
-async def list_states(repo: IStateRepository = Depends(get_state_repo)):
-    states = await repo.find_all()
-    return [StateRead.model_validate(state) for state in states]
+async def list_states(request: Request, repo: IStateRepository = Depends(get_state_repo)):
+    async def build():
+        states = await repo.find_all()
+        return [StateRead.model_validate(state) for state in states]
+    
+    return await cached_response(request, "states", build)
 
 
 @router.get("/{state_code}", response_model=StateRead)
 async def get_state(
     state_code: str,
+    request: Request,
     repo: IStateRepository = Depends(get_state_repo)
 ):
-    state = await repo.get_by_code(state_code)
-    if not state:
-        raise HTTPException(status_code=404, detail="State not found")
-    return StateRead.model_validate(state)
+    async def build():
+        state = await repo.get_by_code(state_code)
+        if not state:
+            raise HTTPException(status_code=404, detail="State not found")
+        return StateRead.model_validate(state)
+    
+    return await cached_response(request, "states", build)
 
 
 @router.post("/", response_model=StateRead)
 async def create_state(
     state_data: StateCreate,
-    repo: IStateRepository = Depends(get_state_repo)
+    repo: IStateRepository = Depends(get_state_repo),
+    session: AsyncSession = Depends(get_db)
 ):
     from app.domain.models.state import State
     state = State(**state_data.model_dump())
-    created = await repo.add(state)
+    async with session.begin():
+        created = await repo.add(state)
+    await invalidate("states")
     return StateRead.model_validate(created)
 
 
@@ -41,27 +52,33 @@ async def create_state(
 async def update_state(
     state_code: str,
     state_data: StateUpdate,
-    repo: IStateRepository = Depends(get_state_repo)
+    repo: IStateRepository = Depends(get_state_repo),
+    session: AsyncSession = Depends(get_db)
 ):
-    state = await repo.get_by_code(state_code)
-    if not state:
-        raise HTTPException(status_code=404, detail="State not found")
-    
-    for field, value in state_data.model_dump(exclude_unset=True).items():
-        setattr(state, field, value)
-    
-    updated = await repo.update(state)
+    async with session.begin():
+        state = await repo.get_by_code(state_code)
+        if not state:
+            raise HTTPException(status_code=404, detail="State not found")
+        
+        for field, value in state_data.model_dump(exclude_unset=True).items():
+            setattr(state, field, value)
+        
+        updated = await repo.update(state)
+    await invalidate("states")
     return StateRead.model_validate(updated)
 
 
 @router.delete("/{state_code}")
 async def delete_state(
     state_code: str,
-    repo: IStateRepository = Depends(get_state_repo)
+    repo: IStateRepository = Depends(get_state_repo),
+    session: AsyncSession = Depends(get_db)
 ):
-    deleted = await repo.delete_by_code(state_code)
+    async with session.begin():
+        deleted = await repo.delete_by_code(state_code)
     if not deleted:
         raise HTTPException(status_code=404, detail="State not found")
+    await invalidate("states")
     return {"message": "State deleted"}
 
 
@@ -76,4 +93,5 @@ async def delete_all_states(
     
     async with session.begin():
         count = await repo.delete_all()
+    await invalidate("states")
     return {"deleted": count}
\ No newline at end of file
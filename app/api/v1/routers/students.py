@@ -1,17 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from uuid import UUID
 from typing import Optional, List
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from app.schemas.student_schema import StudentRead, StudentCreate, StudentUpdate, PaginatedResponse
+from app.schemas.student_schema import (
+    StudentRead, StudentCreate, StudentUpdate, PaginatedResponse, StudentLookupRequest, StudentLookupResponse
+)
 from app.domain.repositories.interfaces import IStudentRepository, StudentFilter
+from app.schemas.bulk_schema import BulkRequest, BulkResponse
+from app.domain.commands.bulk_mutation_command import BulkMutationCommand
+from app.domain.commands.handlers.bulk_mutation_handler import BulkMutationHandler
 from app.api.v1.deps import get_student_repo
-from app.core.db import get_db
+from app.infra.repositories.sqlalchemy_repositories import StudentRepository
+from app.core.db import get_db, get_read_db, session_maker_for
 from pydantic import BaseModel
 from pathlib import Path
 from app.core.config import settings
+from app.core.pagination import encode_cursor, decode_cursor
+from app.core.serialization import fast_json, dumps
+from app.core.cache import cached_response, invalidate
+import asyncio
+import logging
 import os
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/students", tags=["students"])
 
 
@@ -40,10 +54,42 @@ async def list_students(
     reg_no: Optional[str] = None,
     page: int = Query(1, ge=1),
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from a previous response; pass an empty value to start from the beginning"),
+    count: str = Query("exact", pattern="^(exact|estimate)$", description="'estimate' uses the query planner's row estimate for large result sets"),
+    fast: bool = Query(False, description="Project columns in SQL and encode with orjson, skipping model validation"),
     repo: IStudentRepository = Depends(get_student_repo)
 ):
     filters = StudentFilter(schnum, sch_name, batch, state_name, cand_name, reg_no)
-    total, students = await repo.find(filters, limit, (page - 1) * limit)
+    fetch = repo.find_rows if fast else repo.find_page
+    
+    if cursor is not None:
+        # Keyset mode: no OFFSET and no count, so every page costs the same
+        try:
+            after = _decode_student_cursor(cursor) if cursor else None
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        
+        students = await fetch(filters, limit + 1, after=after)
+        has_more = len(students) > limit
+        students = students[:limit]
+        total = None
+        total_is_estimate = False
+        page = None
+    else:
+        total, total_is_estimate = await repo.count(filters, estimate=count == "estimate")
+        students = await fetch(filters, limit, (page - 1) * limit)
+        has_more = len(students) == limit if total_is_estimate else (page - 1) * limit + len(students) < total
+    
+    next_cursor = None
+    if has_more and students:
+        last = students[-1]
+        next_cursor = encode_cursor(last.schnum, last.ser_no, last.id)
+    
+    if fast:
+        return fast_json({
+            "total": total, "total_is_estimate": total_is_estimate, "page": page, "limit": limit,
+            "items": [_row_dict(row) for row in students], "next_cursor": next_cursor
+        })
     
     items = []
     for student in students:
@@ -52,26 +98,48 @@ async def list_students(
             item.school_name = student.school.sch_name
             item.state_name = student.school.state_name
             
-        # Resolve photo URL
-        if student.photo_path and os.path.exists(student.photo_path):
-            # Convert filesystem path to web path
-            # Expected: ./media/photos/REG123.jpg -> /media/photos/REG123.jpg
-            path_obj = Path(student.photo_path)
-            try:
-                relative = path_obj.relative_to(settings.media_root)
-                item.photo_url = f"/media/{relative.as_posix()}"
-            except ValueError:
-                item.photo_url = "/media/null_passport.jpg"
-        else:
-            item.photo_url = "/media/null_passport.jpg"
-            
+        item.photo_url = _photo_url(student.photo_path)
         items.append(item)
     
-    return PaginatedResponse(total=total, page=page, limit=limit, items=items)
+    return PaginatedResponse(
+        total=total, total_is_estimate=total_is_estimate, page=page, limit=limit,
+        items=items, next_cursor=next_cursor
+    )
+
+
+def _photo_url(photo_path: Optional[str]) -> str:
+    """Web path for a stored photo, or the placeholder if it is missing or outside MEDIA_ROOT."""
+    if photo_path and os.path.exists(photo_path):
+        # Convert filesystem path to web path
+        # Expected: ./media/photos/REG123.jpg -> /media/photos/REG123.jpg
+        try:
+            relative = Path(photo_path).relative_to(settings.media_root)
+            return f"/media/{relative.as_posix()}"
+        except ValueError:
+            pass
+    return "/media/null_passport.jpg"
+
+
+def _row_dict(row) -> dict:
+    """Response dict from a projected row, with photo_path swapped for photo_url."""
+    item = row._asdict()
+    item["photo_url"] = _photo_url(item.pop("photo_path"))
+    return item
+
+
+def _row_dicts(rows) -> List[dict]:
+    """_row_dict for a whole partition. Each row stats its photo, so streaming callers run this in a thread."""
+    return [_row_dict(row) for row in rows]
+
+
+def _decode_student_cursor(cursor: str):
+    schnum, ser_no, student_id = decode_cursor(cursor, 3)
+    return schnum, ser_no, UUID(student_id)
 
 
 @router.get("/batches", response_model=List[str])
 async def get_available_batches(
+    request: Request,
     state_code: Optional[str] = None,
     session: AsyncSession = Depends(get_db)
 ):
@@ -80,27 +148,101 @@ async def get_available_batches(
     from app.domain.models.school import School
     from sqlalchemy import distinct
     
-    if state_code:
-        # Get batches for a specific state
-        query = (
-            select(distinct(Student.batch))
-            .join(School, Student.school_id == School.id, isouter=True)
-            .where(School.state == state_code)
-            .where(Student.batch.isnot(None))
-            .order_by(Student.batch)
-        )
-    else:
-        # Get all unique batches
-        query = (
-            select(distinct(Student.batch))
-            .where(Student.batch.isnot(None))
-            .order_by(Student.batch)
-        )
+    async def build():
+        if state_code:
+            # Get batches for a specific state
+            query = (
+                select(distinct(Student.batch))
+                .join(School, Student.school_id == School.id, isouter=True)
+                .where(School.state == state_code)
+                .where(Student.batch.isnot(None))
+                .order_by(Student.batch)
+            )
+        else:
+            # Get all unique batches
+            query = (
+                select(distinct(Student.batch))
+                .where(Student.batch.isnot(None))
+                .order_by(Student.batch)
+            )
+        
+        result = await session.execute(query)
+        return [row[0] for row in result.fetchall()]
     
-    result = await session.execute(query)
-    batches = [row[0] for row in result.fetchall()]
+    return await cached_response(request, "students", build)
+
+
+@router.post("/lookup", response_model=StudentLookupResponse)
+async def lookup_students(
+    request: StudentLookupRequest,
+    http_request: Request,
+    stream: Optional[bool] = Query(None, description="Stream NDJSON; defaults to on for large inputs"),
+    session: AsyncSession = Depends(get_read_db)
+):
+    """
+    Resolve many reg_nos at once (exact match). Returns matched students with school and photo
+    status plus the reg_nos that were not found. Large inputs are streamed as NDJSON, one
+    {"matched": true, ...} or {"reg_no": ..., "matched": false} object per line.
+    """
+    reg_nos = list(dict.fromkeys(r.strip() for r in request.reg_nos if r and r.strip()))
+    if stream is None:
+        stream = len(reg_nos) > settings.lookup_stream_threshold
+    
+    if not stream:
+        found, missing = [], []
+        async for rows, misses in _lookup_chunks(StudentRepository(session), reg_nos, request.batch):
+            found.extend(await asyncio.to_thread(_lookup_dicts, rows))
+            missing.extend(misses)
+        return fast_json({"found": found, "missing": missing})
+    
+    session_maker = session_maker_for(http_request)
+    
+    async def generate():
+        async with session_maker() as stream_session:
+            async for rows, misses in _lookup_chunks(StudentRepository(stream_session), reg_nos, request.batch):
+                items = await asyncio.to_thread(_lookup_dicts, rows)
+                lines = [dumps({**item, "matched": True}) for item in items]
+                lines.extend(dumps({"reg_no": reg_no, "matched": False}) for reg_no in misses)
+                yield b"".join(line + b"\n" for line in lines)
     
-    return batches
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
+async def _lookup_chunks(repo: StudentRepository, reg_nos: List[str], batch: Optional[str] = None):
+    """Yield (matched rows, missing reg_nos) per chunk of the input; a reg_no can match one row per batch."""
+    chunk_size = settings.lookup_chunk_size
+    for i in range(0, len(reg_nos), chunk_size):
+        chunk = reg_nos[i:i + chunk_size]
+        rows = await repo.find_by_reg_nos(chunk, batch)
+        matched = {row.reg_no for row in rows}
+        yield rows, [reg_no for reg_no in chunk if reg_no not in matched]
+
+
+def _lookup_dicts(rows) -> List[dict]:
+    items = _row_dicts(rows)
+    for item in items:
+        item["has_photo"] = item["photo_url"] != "/media/null_passport.jpg"
+    return items
+
+
+@router.post("/bulk", response_model=BulkResponse)
+async def bulk_mutate_students(
+    request: BulkRequest,
+    repo: IStudentRepository = Depends(get_student_repo),
+    session: AsyncSession = Depends(get_db)
+):
+    """
+    Apply many create/update/delete operations in one call. Operations are applied in chunked
+    transactions with set-based SQL; each item gets its own result in input order.
+    """
+    handler = BulkMutationHandler(session, repo, StudentCreate, StudentUpdate, unique_field="reg_no")
+    outcomes = await handler.handle(BulkMutationCommand(operations=request.operations))
+    await invalidate("students")
+    
+    summary = {}
+    for outcome in outcomes:
+        summary[outcome.status] = summary.get(outcome.status, 0) + 1
+    return fast_json({"summary": summary, "results": [vars(outcome) for outcome in outcomes]})
 
 
 @router.get("/{student_id}", response_model=StudentRead)
@@ -122,11 +264,14 @@ async def get_student(
 @router.post("/", response_model=StudentRead)
 async def create_student(
     student_data: StudentCreate,
-    repo: IStudentRepository = Depends(get_student_repo)
+    repo: IStudentRepository = Depends(get_student_repo),
+    session: AsyncSession = Depends(get_db)
 ):
     from app.domain.models.student import Student
     student = Student(**student_data.model_dump())
-    created = await repo.add(student)
+    async with session.begin():
+        created = await repo.add(student)
+    await invalidate("students")
     return StudentRead.model_validate(created)
 
 
@@ -134,27 +279,33 @@ async def create_student(
 async def update_student(
     student_id: UUID,
     student_data: StudentUpdate,
-    repo: IStudentRepository = Depends(get_student_repo)
+    repo: IStudentRepository = Depends(get_student_repo),
+    session: AsyncSession = Depends(get_db)
 ):
-    student = await repo.get_by_id(student_id)
-    if not student:
-        raise HTTPException(status_code=404, detail="Student not found")
-    
-    for field, value in student_data.model_dump(exclude_unset=True).items():
-        setattr(student, field, value)
-    
-    updated = await repo.update(student)
+    async with session.begin():
+        student = await repo.get_by_id(student_id)
+        if not student:
+            raise HTTPException(status_code=404, detail="Student not found")
+        
+        for field, value in student_data.model_dump(exclude_unset=True).items():
+            setattr(student, field, value)
+        
+        updated = await repo.update(student)
+    await invalidate("students")
     return StudentRead.model_validate(updated)
 
 
 @router.delete("/{student_id}")
 async def delete_student(
     student_id: UUID,
-    repo: IStudentRepository = Depends(get_student_repo)
+    repo: IStudentRepository = Depends(get_student_repo),
+    session: AsyncSession = Depends(get_db)
 ):
-    deleted = await repo.delete_by_id(student_id)
+    async with session.begin():
+        deleted = await repo.delete_by_id(student_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="Student not found")
+    await invalidate("students")
     return {"message": "Student deleted"}
 
 
@@ -169,6 +320,84 @@ async def delete_all_students(
     
     async with session.begin():
         count = await repo.delete_all()
+    await invalidate("students")
+    return {"deleted": count}
+
+
+@router.delete("/by-state/{state_code}")
+async def delete_students_by_state(
+    state_code: str,
+    batch: Optional[str] = None,
+    force: bool = Query(False),
+    repo: IStudentRepository = Depends(get_student_repo),
+    session: AsyncSession = Depends(get_db)
+):
+    """Delete every student in a state, optionally only one batch, e.g. before a reload."""
+    return await _delete_scoped(repo, session, force, state=state_code, batch=batch)
+
+
+@router.delete("/by-batch/{batch}")
+async def delete_students_by_batch(
+    batch: str,
+    force: bool = Query(False),
+    repo: IStudentRepository = Depends(get_student_repo),
+    session: AsyncSession = Depends(get_db)
+):
+    return await _delete_scoped(repo, session, force, batch=batch)
+
+
+@router.post("/by-batch/{batch}/archive")
+async def archive_batch(
+    batch: str,
+    force: bool = Query(False),
+    repo: IStudentRepository = Depends(get_student_repo),
+    session: AsyncSession = Depends(get_db)
+):
+    """
+    Detach a past exam cycle's partition from `students` in one metadata-only step.
+    Its rows stay in a standalone `students_archive_*` table that can be dumped or dropped.
+    """
+    if not force:
+        raise HTTPException(status_code=400, detail="Add ?force=true to confirm archiving")
+    
+    try:
+        async with session.begin():
+            archive_table = await repo.archive_batch(batch)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if archive_table is None:
+        raise HTTPException(status_code=404, detail=f"No partition for batch {batch}")
+    await invalidate("students")
+    return {"batch": batch, "archive_table": archive_table}
+
+
+@router.delete("/by-school/{schnum}")
+async def delete_students_by_school(
+    schnum: str,
+    batch: Optional[str] = None,
+    force: bool = Query(False),
+    repo: IStudentRepository = Depends(get_student_repo),
+    session: AsyncSession = Depends(get_db)
+):
+    return await _delete_scoped(repo, session, force, schnum=schnum, batch=batch)
+
+
+async def _delete_scoped(repo: IStudentRepository, session: AsyncSession, force: bool, **scope) -> dict:
+    if not force:
+        raise HTTPException(status_code=400, detail="Add ?force=true to confirm deletion")
+    
+    async with session.begin():
+        count = await repo.delete_scoped(**scope)
+    await invalidate("students")
+    
+    # Keep planner statistics (and count=estimate) in line after large deletes. The delete is already
+    # committed, so a failure here is only logged; autovacuum will analyze the table eventually.
+    if count >= settings.count_estimate_min_rows:
+        try:
+            async with session.begin():
+                await repo.analyze()
+        except Exception:
+            logger.warning("ANALYZE after deleting %d students failed", count, exc_info=True)
     return {"deleted": count}
 
 
@@ -176,13 +405,15 @@ async def delete_all_students(
 async def get_students_by_state(
     state_code: str,
     batch: Optional[str] = None,
+    fast: bool = Query(False, description="Project columns in SQL and encode with orjson, skipping model validation"),
     session: AsyncSession = Depends(get_db)
 ):
+    if fast:
+        rows = await StudentRepository(session).find_by_state(state_code, batch)
+        return fast_json([_row_dict(row) for row in rows])
+    
     from app.domain.models.student import Student
     from app.domain.models.school import School
-    from app.core.config import settings
-    from pathlib import Path
-    import os
     
     query = (
         select(Student, School)
@@ -199,15 +430,6 @@ async def get_students_by_state(
     
     students_data = []
     for student, school in rows:
-        photo_url = "/media/null_passport.jpg"
-        if student.photo_path and os.path.exists(student.photo_path):
-            path_obj = Path(student.photo_path)
-            try:
-                relative = path_obj.relative_to(settings.media_root)
-                photo_url = f"/media/{relative.as_posix()}"
-            except ValueError:
-                pass
-
         students_data.append(StudentWithSchoolDetails(
             reg_no=student.reg_no,
             cand_name=student.cand_name,
@@ -216,8 +438,48 @@ async def get_students_by_state(
             schnum=student.schnum,
             town=school.town if school else None,
             custodian=school.custodian if school else None,
-            photo_url=photo_url,
+            photo_url=_photo_url(student.photo_path),
             batch=student.batch
         ))
     
-    return students_data
\ No newline at end of file
+    return students_data
+
+
+@router.get("/by-state/{state_code}/stream")
+async def stream_students_by_state(
+    request: Request,
+    state_code: str,
+    batch: Optional[str] = None,
+    format: str = Query("ndjson", pattern="^(ndjson|json)$")
+):
+    """
+    Streaming variant of /by-state/{state_code}: rows are sent as they come off a
+    server-side cursor, one JSON object per line (ndjson) or as a chunked JSON array.
+    """
+    session_maker = session_maker_for(request)
+    
+    async def generate():
+        # The session lives inside the generator so it stays open while the body streams
+        async with session_maker() as session:
+            repo = StudentRepository(session)
+            first = True
+            if format == "json":
+                yield b"["
+            async for rows in repo.stream_by_state(state_code, batch):
+                # Photo checks for the whole partition run in one thread hop, off the event loop
+                items = await asyncio.to_thread(_row_dicts, rows)
+                lines = []
+                for item in items:
+                    line = dumps(item)
+                    if format == "json":
+                        lines.append(line if first else b"," + line)
+                        first = False
+                    else:
+                        lines.append(line + b"\n")
+                yield b"".join(lines)
+            if format == "json":
+                yield b"]"
+    
+    media_type = "application/x-ndjson" if format == "ndjson" else "application/json"
+    return StreamingResponse(generate(), media_type=media_type)
+
@@ -1,9 +1,13 @@
+import logging
 import tempfile
 from pathlib import Path
 from typing import Optional, List
 from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, BackgroundTasks
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.db import get_db
+from app.core.cache import invalidate
+from app.core.metrics import DBF_ROWS_IMPORTED
+from app.core.instrumentation import without_request_stats
 from app.domain.commands.upload_dbf_command import UploadDbfCommand
 from app.domain.commands.upload_photos_command import UploadPhotosCommand
 from app.domain.commands.handlers.upload_dbf_handler import UploadDbfHandler
@@ -12,6 +16,8 @@ from app.domain.commands.handlers.scan_photos_handler import ScanPhotosHandler
 from app.schemas.upload_schema import ScanPhotosRequest
 from app.api.v1.deps import get_student_repo, get_school_repo, get_state_repo
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/uploads", tags=["uploads"])
 
 
@@ -52,7 +58,10 @@ async def upload_state_dbf(
                 ))
             
             states_imported = await state_repo.bulk_upsert(states)
-            
+        
+        # Invalidate again after commit so no request re-caches pre-import data
+        await invalidate("states")
+        DBF_ROWS_IMPORTED.labels("states").inc(states_imported)
         return {
             "states_imported": states_imported,
             "message": "State data imported successfully. You can now upload fin25.dbf"
@@ -117,7 +126,9 @@ async def upload_school_dbf(
             total_schools = len(schools)
             schools_imported = await school_repo.bulk_upsert(schools, valid_state_codes)
             skipped = total_schools - schools_imported
-            
+        
+        await invalidate("schools")
+        DBF_ROWS_IMPORTED.labels("schools").inc(schools_imported)
         return {
             "schools_imported": schools_imported,
             "schools_skipped": skipped,
@@ -141,7 +152,7 @@ async def upload_student_dbf(
         raise HTTPException(status_code=400, detail=f"Invalid file type: {master_dbf.filename}")
     
     import os
-    print(f"Uploading master DBF: {master_dbf.filename}, size: {master_dbf.size if hasattr(master_dbf, 'size') else 'unknown'}")
+    logger.info("Uploading master DBF %s, size %s", master_dbf.filename, getattr(master_dbf, "size", "unknown"))
     
     with tempfile.NamedTemporaryFile(suffix='.dbf', delete=False) as temp_file:
         temp_file.write(await master_dbf.read())
@@ -194,8 +205,14 @@ async def upload_student_dbf(
                 if not school:
                     missing_school_matches.append(record['REG_NO'])
             
-            from app.infra.repositories.sqlalchemy_repositories import StudentRepository
-            student_repo = StudentRepository(session)
+        from app.infra.repositories.sqlalchemy_repositories import StudentRepository
+        student_repo = StudentRepository(session)
+        # Give each batch its own partition so it can be archived later. The DDL locks `students`
+        # exclusively, so it commits on its own instead of holding the lock for the whole import.
+        async with session.begin():
+            await student_repo.ensure_batch_partitions({s.batch for s in students})
+        
+        async with session.begin():
             students_imported = await student_repo.bulk_add(students)
             
             # Update student counts for schools and states
@@ -223,15 +240,16 @@ async def upload_student_dbf(
             
             # Update state counts (you might want to add a students field to State model)
             # For now this is just for demonstration
-            
+        
+        await invalidate("students")
+        DBF_ROWS_IMPORTED.labels("students").inc(students_imported)
         return {
             "students_imported": students_imported,
             "missing_school_matches": missing_school_matches,
             "message": "Student data imported successfully. All uploads complete!"
         }
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Student DBF import failed")
         raise HTTPException(status_code=500, detail=str(e))
     finally:
         import os
@@ -287,8 +305,7 @@ async def upload_photos(
             "errors": result.errors
         }
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Photo upload failed")
         raise HTTPException(status_code=500, detail=str(e))
     finally:
         import os
@@ -314,7 +331,7 @@ async def scan_photos(
     handler = ScanPhotosHandler(session)
     
     # Add to background tasks to avoid timeout
-    background_tasks.add_task(handler.handle_scan, request.path)
+    background_tasks.add_task(without_request_stats(handler.handle_scan), request.path)
     
     return {
         "message": f"Photo scan initiated for path: {request.path}. This will run in the background.",
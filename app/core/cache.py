@@ -0,0 +1,200 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+import pydantic_core
+from fastapi import Request
+from fastapi.responses import Response
+from .config import settings
+
+
+class TTLCache:
+    """Thread-safe LRU cache bounded by entry count, with a per-entry time-to-live."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class MemoryCacheBackend:
+    """Per-process backend. Invalidation only reaches the worker that performed the write."""
+    name = "memory"
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._entries = TTLCache(maxsize, ttl)
+        self._versions: Dict[str, int] = {}
+        self._bumped_at: Dict[str, float] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._entries.get(key)
+
+    async def set(self, key: str, value: bytes) -> None:
+        self._entries.set(key, value)
+
+    async def version(self, namespace: str) -> int:
+        return self._versions.get(namespace, 0)
+
+    async def bump(self, namespace: str) -> None:
+        self._versions[namespace] = self._versions.get(namespace, 0) + 1
+        self._bumped_at[namespace] = time.time()
+
+    async def bumped_at(self, *namespaces: str) -> float:
+        """Wall-clock time of the latest bump of any of the namespaces (0 if never)."""
+        return max((self._bumped_at.get(namespace, 0.0) for namespace in namespaces), default=0.0)
+
+    def size(self) -> int:
+        return len(self._entries)
+
+
+class RedisCacheBackend:
+    """Shared backend for multi-worker deployments; any Redis-compatible server works."""
+    name = "redis"
+
+    def __init__(self, url: str, ttl: float, prefix: str = "neco-album:"):
+        import redis.asyncio as redis  # optional dependency, see requirements.txt
+
+        self._redis = redis.from_url(url)
+        self._ttl = int(ttl)
+        self._prefix = prefix
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._redis.get(self._prefix + key)
+
+    async def set(self, key: str, value: bytes) -> None:
+        await self._redis.set(self._prefix + key, value, ex=self._ttl)
+
+    async def version(self, namespace: str) -> int:
+        return int(await self._redis.get(f"{self._prefix}version:{namespace}") or 0)
+
+    async def bump(self, namespace: str) -> None:
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.incr(f"{self._prefix}version:{namespace}")
+            pipe.set(f"{self._prefix}bumped:{namespace}", time.time(), ex=self._ttl)
+            await pipe.execute()
+
+    async def bumped_at(self, *namespaces: str) -> float:
+        values = await self._redis.mget([f"{self._prefix}bumped:{namespace}" for namespace in namespaces])
+        return max((float(value) for value in values if value is not None), default=0.0)
+
+    def size(self) -> Optional[int]:
+        return None
+
+
+def _create_backend():
+    if settings.cache_redis_url:
+        return RedisCacheBackend(settings.cache_redis_url, settings.cache_ttl_seconds)
+    return MemoryCacheBackend(settings.cache_max_entries, settings.cache_ttl_seconds)
+
+
+cache_backend = _create_backend()
+
+# Hit/miss counters for this process, by cache area
+cache_stats: Dict[str, Dict[str, int]] = {
+    "response": {"hits": 0, "misses": 0, "not_modified": 0},
+    "count": {"hits": 0, "misses": 0},
+}
+
+# Cached namespaces that depend on each table. Student listings filter and join on schools,
+# so school writes also invalidate student data.
+_NAMESPACES_BY_TABLE = {
+    "students": ("students",),
+    "schools": ("schools", "students"),
+    "states": ("states",),
+}
+_ALL_NAMESPACES = tuple(sorted({ns for namespaces in _NAMESPACES_BY_TABLE.values() for ns in namespaces}))
+
+
+async def invalidate(*tables: str) -> None:
+    """Invalidate every cached response and count derived from the given tables."""
+    namespaces = {ns for table in tables for ns in _NAMESPACES_BY_TABLE.get(table, (table,))}
+    for namespace in namespaces:
+        await cache_backend.bump(namespace)
+
+
+async def replica_may_be_stale(*namespaces: str) -> bool:
+    """
+    True while a read replica may not have replayed the latest write to these namespaces (all of them
+    if none are given), i.e. for DATABASE_REPLICA_MAX_LAG_SECONDS after it. Reads made meanwhile are
+    not cached, and GET requests use the primary.
+    """
+    if not settings.database_replica_url:
+        return False
+    last_write = await cache_backend.bumped_at(*(namespaces or _ALL_NAMESPACES))
+    return time.time() - last_write < settings.database_replica_max_lag_seconds
+
+
+async def versioned_key(namespace: str, *parts: Any) -> str:
+    """Cache key that stops matching as soon as the namespace is invalidated."""
+    version = await cache_backend.version(namespace)
+    return f"{namespace}:v{version}:{parts!r}"
+
+
+async def cached_response(request: Request, namespace: str,
+                          build: Callable[[], Awaitable[Any]]) -> Response:
+    """
+    Serve a JSON GET response from the cache, keyed by route and query string, building it
+    with `build` on a miss. Sends an ETag and answers If-None-Match with 304 Not Modified.
+    """
+    if not settings.response_cache_enabled:
+        return Response(pydantic_core.to_json(await build()), media_type="application/json")
+
+    key = await versioned_key(namespace, request.url.path, sorted(request.query_params.multi_items()))
+    # Checked after the key: a lagging replica read must not be stored under the new version
+    cacheable = not await replica_may_be_stale(namespace)
+    entry = await cache_backend.get(key)
+    if entry is not None:
+        cache_stats["response"]["hits"] += 1
+        etag, body = entry.split(b"\n", 1)
+        etag = etag.decode("ascii")
+    else:
+        cache_stats["response"]["misses"] += 1
+        body = pydantic_core.to_json(await build())
+        etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+        if cacheable and len(body) <= settings.response_cache_max_entry_bytes:
+            await cache_backend.set(key, etag.encode("ascii") + b"\n" + body)
+
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        cache_stats["response"]["not_modified"] += 1
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+def cache_info() -> dict:
+    return {
+        "backend": cache_backend.name,
+        "entries": cache_backend.size(),
+        **cache_stats,
+    }
@@ -1,16 +1,147 @@
+import threading
+import time
+from collections import deque
+from typing import Optional
+from fastapi import Request
+from sqlalchemy import exc
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from .config import settings
+from .cache import replica_may_be_stale
 
 
 class Base(DeclarativeBase):
     pass
 
 
-engine = create_async_engine(settings.database_url, echo=True)
+class PoolStats:
+    """Checkout wait times for one pool: totals plus a window of recent waits for percentiles."""
+
+    def __init__(self, window: int = 1000):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._recent = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, wait: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.timeouts += timed_out
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            self._recent.append(wait)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            recent = sorted(self._recent)
+        def pct(p: float) -> float:
+            return round(recent[min(len(recent) - 1, int(p * len(recent)))] * 1000, 3) if recent else 0.0
+        return {
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_ms_avg": round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+            "wait_ms_p50": pct(0.50),
+            "wait_ms_p95": pct(0.95),
+            "wait_ms_max": round(self.max_wait * 1000, 3),
+        }
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited (including pre-ping and connect)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.stats.record(time.perf_counter() - start, timed_out=True)
+            raise
+        self.stats.record(time.perf_counter() - start)
+        return connection
+
+
+def build_engine(url: str, **overrides):
+    """Async engine configured from settings; keyword arguments override individual pool options."""
+    options = dict(
+        echo=settings.db_echo,
+        poolclass=InstrumentedPool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        connect_args={
+            # asyncpg's own cache, and SQLAlchemy's prepared statement cache on top of it.
+            # Set both to 0 behind PgBouncer in transaction mode.
+            "statement_cache_size": settings.db_statement_cache_size,
+            "prepared_statement_cache_size": settings.db_statement_cache_size,
+        },
+    )
+    options.update(overrides)
+    return create_async_engine(url, **options)
+
+
+def pool_status(target=None) -> dict:
+    pool = (target or engine).pool
+    status = {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": pool._max_overflow,
+    }
+    if isinstance(pool, InstrumentedPool):
+        status.update(pool.stats.snapshot())
+    return status
+
+
+engine = build_engine(settings.database_url)
 async_session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+# Optional streaming replica for read-only work; without one, reads use the primary
+replica_engine = build_engine(settings.database_replica_url) if settings.database_replica_url else None
+read_session_maker = (
+    async_sessionmaker(replica_engine, class_=AsyncSession, expire_on_commit=False)
+    if replica_engine is not None else async_session_maker
+)
+
+# Send this header (1/true) to read from the primary, e.g. right after a write
+READ_YOUR_WRITES_HEADER = "X-Read-Your-Writes"
+
+
+def session_maker_for(request: Optional[Request], read_only: bool = True) -> async_sessionmaker:
+    """Replica session maker for read-only work unless the request asks to read its own writes."""
+    if not read_only or request is None:
+        return async_session_maker
+    if request.headers.get(READ_YOUR_WRITES_HEADER, "").lower() in ("1", "true", "yes"):
+        return async_session_maker
+    return read_session_maker
+
+
+async def get_db(request: Request) -> AsyncSession:
+    """
+    GET/HEAD requests get a replica session; everything else goes to the primary. Right after a write
+    GETs use the primary too, so cached responses are rebuilt from data that includes it.
+    """
+    read_only = request.method in ("GET", "HEAD") and not await replica_may_be_stale()
+    maker = session_maker_for(request, read_only=read_only)
+    async with maker() as session:
+        yield session
+
 
-async def get_db() -> AsyncSession:
-    async with async_session_maker() as session:
-        yield session
\ No newline at end of file
+async def get_read_db(request: Request) -> AsyncSession:
+    """Replica session for read-only endpoints that are not GETs (album generation, lookups)."""
+    async with session_maker_for(request)() as session:
+        yield session
@@ -0,0 +1,118 @@
+import functools
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from .config import settings
+
+logger = logging.getLogger("app.sql")
+
+
+class RequestSQLStats:
+    """SQL activity of one request. Rows are counted for buffered statements only."""
+    __slots__ = ("statements", "db_time", "rows", "by_statement")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_time = 0.0
+        self.rows = 0
+        self.by_statement: Counter = Counter()
+
+    def most_repeated(self):
+        return self.by_statement.most_common(1)[0] if self.by_statement else (None, 0)
+
+
+_current: ContextVar[Optional[RequestSQLStats]] = ContextVar("request_sql_stats", default=None)
+
+
+def current_sql_stats() -> Optional[RequestSQLStats]:
+    return _current.get()
+
+
+def without_request_stats(func):
+    """
+    Wrap a background-task coroutine function so its SQL is not counted against the request that
+    scheduled it. Starlette runs BackgroundTasks inside the request's context, after the response.
+    """
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        token = _current.set(None)
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            _current.reset(token)
+    return wrapper
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._query_started
+    if elapsed * 1000 >= settings.slow_query_ms:
+        logger.warning("Slow query (%.1f ms): %s", elapsed * 1000, statement[:1000])
+
+    stats = _current.get()
+    if stats is None:
+        return
+    stats.statements += 1
+    stats.db_time += elapsed
+    if cursor.rowcount > 0:
+        stats.rows += cursor.rowcount
+    # Statements are compiled once and cached, so repeats of the same query share one string
+    stats.by_statement[statement] += 1
+
+
+def instrument_engine(engine) -> None:
+    """Attach the timing hooks to an (async) engine; call once per engine."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class SQLInstrumentationMiddleware:
+    """
+    Pure ASGI middleware that collects per-request SQL stats. It adds a Server-Timing header
+    (statements and DB time up to the moment the headers are sent) and logs requests where one
+    statement repeats often enough to suggest an N+1 pattern.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.sql_instrumentation_enabled:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestSQLStats()
+        token = _current.set(stats)
+        started = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                total_ms = (time.perf_counter() - started) * 1000
+                timing = (
+                    f'db;dur={stats.db_time * 1000:.1f};desc="{stats.statements} queries, {stats.rows} rows", '
+                    f'app;dur={total_ms:.1f}'
+                )
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", timing.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            statement, repeats = stats.most_repeated()
+            if repeats >= settings.n_plus_one_threshold:
+                logger.warning(
+                    "Possible N+1 in %s %s: %d statements, one repeated %d times: %s",
+                    scope.get("method"), scope.get("path"), stats.statements, repeats, statement[:300]
+                )
+            logger.debug(
+                "%s %s: %d statements, %.1f ms in DB, %d rows", scope.get("method"), scope.get("path"),
+                stats.statements, stats.db_time * 1000, stats.rows
+            )
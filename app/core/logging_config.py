@@ -0,0 +1,212 @@
+"""
+Application logging: loggers hand records to a QueueHandler and a background QueueListener does
+the formatting and I/O, so render loops never block on a slow console or disk.
+
+- Levels per subsystem: LOG_LEVEL sets the default, and LOG_LEVELS overrides logger prefixes, e.g.
+  LOG_LEVELS="app.infra.pdf=WARNING,app.sql=ERROR".
+- LOG_FORMAT=json emits one JSON object per line, including any `extra={...}` fields.
+- job_log(job_id) copies the records logged inside it (in this task/thread) to LOG_DIR/jobs/<job_id>.log;
+  coroutines use async_job_log, which does not block the event loop while the file is flushed.
+- WarningAggregator collapses repetitive warnings into one summary line per key.
+"""
+import asyncio
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import re
+import threading
+from collections import Counter, OrderedDict
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
+from .config import settings
+
+_current_job: ContextVar[Optional[str]] = ContextVar("log_job_id", default=None)
+
+# LogRecord attributes that are not user-supplied `extra` fields
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "job_id"}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "job_id", None):
+            entry["job_id"] = record.job_id
+        entry.update({k: v for k, v in vars(record).items() if k not in _RECORD_ATTRS})
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class _JobIdFilter(logging.Filter):
+    """Stamps the active job id on the record while still in the logging thread/task."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.job_id = _current_job.get()
+        return True
+
+
+class _JobFileRouter(logging.Handler):
+    """Runs in the listener thread; writes each record to the file of the job it belongs to."""
+
+    def __init__(self):
+        super().__init__()
+        self._files: Dict[str, logging.Handler] = {}
+        self._files_lock = threading.Lock()
+
+    def add(self, job_id: str, handler: logging.Handler) -> None:
+        with self._files_lock:
+            self._files[job_id] = handler
+
+    def remove(self, job_id: str) -> Optional[logging.Handler]:
+        with self._files_lock:
+            return self._files.pop(job_id, None)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        job_id = getattr(record, "job_id", None)
+        if job_id is None:
+            return
+        with self._files_lock:
+            handler = self._files.get(job_id)
+        if handler is not None:
+            handler.handle(record)
+
+
+class _FlushMarker:
+    """Queued after a job's last record; set once the listener has handled everything before it."""
+
+    def __init__(self):
+        self.done = threading.Event()
+
+
+class _Listener(logging.handlers.QueueListener):
+    def handle(self, record) -> None:
+        if isinstance(record, _FlushMarker):
+            record.done.set()
+            return
+        super().handle(record)
+
+
+_listener: Optional[_Listener] = None
+_job_router = _JobFileRouter()
+
+
+def _formatter() -> logging.Formatter:
+    if settings.log_format == "json":
+        return JsonFormatter()
+    return logging.Formatter("%(asctime)s %(levelname)-7s %(name)s: %(message)s")
+
+
+def _parse_levels(spec: str) -> Dict[str, str]:
+    levels = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, level = item.partition("=")
+        levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def setup_logging() -> None:
+    """Install the queue-based handlers on the root logger. Safe to call more than once per process."""
+    global _listener
+    if _listener is not None:
+        return
+
+    console = logging.StreamHandler()
+    console.setFormatter(_formatter())
+
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(_JobIdFilter())
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(settings.log_level.upper())
+    for name, level in _parse_levels(settings.log_levels).items():
+        logging.getLogger(name).setLevel(level)
+
+    _listener = _Listener(log_queue, console, _job_router, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
+def _open_job_log(job_id: str) -> Tuple[Path, logging.Handler]:
+    directory = Path(settings.log_dir) / "jobs"
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{re.sub(r'[^A-Za-z0-9_.-]+', '_', job_id)}.log"
+
+    handler = logging.FileHandler(path, encoding="utf-8")
+    handler.setFormatter(_formatter())
+    _job_router.add(job_id, handler)
+    return path, handler
+
+
+def _close_job_log(job_id: str, handler: logging.Handler) -> None:
+    # Records still queued for this job are flushed before the file closes; blocks for up to 5s
+    if _listener is not None:
+        marker = _FlushMarker()
+        _listener.queue.put_nowait(marker)
+        marker.done.wait(timeout=5)
+    _job_router.remove(job_id)
+    handler.close()
+
+
+@contextmanager
+def job_log(job_id: str) -> Iterator[Path]:
+    """Also write everything logged inside the block to its own file; yields the file path."""
+    path, handler = _open_job_log(job_id)
+    token = _current_job.set(job_id)
+    try:
+        yield path
+    finally:
+        _current_job.reset(token)
+        _close_job_log(job_id, handler)
+
+
+@asynccontextmanager
+async def async_job_log(job_id: str) -> AsyncIterator[Path]:
+    """job_log for coroutines: the final flush waits in a worker thread, not on the event loop."""
+    path, handler = _open_job_log(job_id)
+    token = _current_job.set(job_id)
+    try:
+        yield path
+    finally:
+        _current_job.reset(token)
+        await asyncio.to_thread(_close_job_log, job_id, handler)
+
+
+class WarningAggregator:
+    """
+    Collects repetitive warnings by key and logs one summary line per key on flush(), e.g.
+    "1,234 missing photos in school 0010017 (e.g. 2511..., 2511...)".
+    """
+
+    def __init__(self, logger: logging.Logger, samples: int = 5):
+        self.logger = logger
+        self.samples = samples
+        self._counts: Counter = Counter()
+        self._examples: "OrderedDict[str, List[str]]" = OrderedDict()
+
+    def add(self, key: str, example: str = "") -> None:
+        self._counts[key] += 1
+        examples = self._examples.setdefault(key, [])
+        if example and len(examples) < self.samples:
+            examples.append(example)
+
+    def __len__(self) -> int:
+        return sum(self._counts.values())
+
+    def flush(self, level: int = logging.WARNING) -> None:
+        for key, examples in self._examples.items():
+            sample = f" (e.g. {', '.join(examples)})" if examples else ""
+            self.logger.log(level, "%s %s%s", f"{self._counts[key]:,}", key, sample,
+                            extra={"aggregated": key, "count": self._counts[key]})
+        self._counts.clear()
+        self._examples.clear()
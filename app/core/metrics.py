@@ -0,0 +1,92 @@
+"""
+Prometheus metrics. With several uvicorn workers or render subprocesses, set
+PROMETHEUS_MULTIPROC_DIR to an empty, writable directory before the processes start:
+every process then writes its samples there and /metrics aggregates them.
+"""
+import os
+import time
+from contextlib import contextmanager
+from typing import Optional
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+)
+
+REQUEST_DURATION = Histogram(
+    "neco_http_request_duration_seconds", "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600),
+)
+DBF_ROWS_IMPORTED = Counter("neco_dbf_rows_imported_total", "Rows imported from DBF files", ["table"])
+PHOTOS_PROCESSED = Counter(
+    "neco_photos_processed_total", "Photos matched (or not) to a student", ["source", "result"]
+)
+ALBUMS_RENDERED = Counter("neco_albums_rendered_total", "Album PDFs rendered", ["generator", "status"])
+ALBUM_PAGES_RENDERED = Counter("neco_album_pages_rendered_total", "Album pages rendered", ["generator"])
+RENDER_STAGE_SECONDS = Histogram(
+    "neco_render_stage_seconds", "Time spent in each album rendering stage", ["stage"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300),
+)
+QUEUE_DEPTH = Gauge("neco_queue_depth", "Work items waiting", ["queue"], multiprocess_mode="livesum")
+
+
+@contextmanager
+def time_stage(stage: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        RENDER_STAGE_SECONDS.labels(stage).observe(time.perf_counter() - start)
+
+
+def metrics_response_body() -> bytes:
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
+
+METRICS_CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+
+def route_template(scope) -> Optional[str]:
+    """Full template of the matched route, e.g. `/api/v1/students/{student_id}`, or None if nothing matched."""
+    route = scope.get("route")
+    path_format = getattr(route, "path_format", None)
+    if path_format is None:
+        return None
+    # Newer FastAPI leaves the router's own route in scope["route"]; the include_router prefix is only
+    # part of the effective route it matched through
+    effective = (scope.get("fastapi") or {}).get("effective_route_context")
+    effective_format = getattr(effective, "path_format", None)
+    if effective_format:
+        path_format = effective_format
+    return scope.get("root_path", "") + path_format
+
+
+class PrometheusMiddleware:
+    """Pure ASGI middleware recording request latency labelled by route template, not raw path."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # Unmatched paths share one label so scanners cannot blow up the series count
+            template = route_template(scope) or "unmatched"
+            REQUEST_DURATION.labels(scope["method"], template, str(status)).observe(time.perf_counter() - start)
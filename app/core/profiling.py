@@ -0,0 +1,127 @@
+"""
+Sampling profiler hooks built on pyinstrument (optional dependency: pip install pyinstrument).
+
+- Per request: send `X-Profile-Token: <PROFILING_ADMIN_TOKEN>` (or `?_profile=<token>`) and the
+  request runs under the profiler. The profile is written to PROFILE_DIR and the `X-Profile-Url`
+  response header says where to download it (with the same token).
+- Background: `profiled(name)` wraps a unit of work (e.g. one school album) and profiles a
+  PROFILE_SAMPLE_RATE fraction of them. It only writes files, so it works the same inside
+  render worker processes.
+"""
+import hmac
+import logging
+import random
+import re
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+from urllib.parse import parse_qs
+from .config import settings
+
+logger = logging.getLogger("app.profiling")
+
+PROFILE_HEADER = b"x-profile-token"
+PROFILE_QUERY_PARAM = "_profile"
+
+
+def profiles_dir() -> Path:
+    return Path(settings.profile_dir)
+
+
+def is_admin_token(token: Optional[str]) -> bool:
+    admin_token = settings.profiling_admin_token
+    return bool(token and admin_token and hmac.compare_digest(token, admin_token))
+
+
+def _profile_filename(name: str) -> str:
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", name).strip("_")[:80] or "profile"
+    extension = "html" if settings.profile_format == "html" else "speedscope.json"
+    return f"{time.strftime('%Y%m%d-%H%M%S')}_{random.getrandbits(32):08x}_{slug}.{extension}"
+
+
+def _new_profiler(async_mode: str):
+    try:
+        from pyinstrument import Profiler  # optional dependency, see requirements.txt
+    except ImportError:
+        logger.warning("Profiling requested but pyinstrument is not installed")
+        return None
+    return Profiler(interval=settings.profile_interval_ms / 1000, async_mode=async_mode)
+
+
+def _write_profile(profiler, filename: str) -> Path:
+    directory = profiles_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / filename
+    if settings.profile_format == "html":
+        path.write_text(profiler.output_html(), encoding="utf-8")
+    else:
+        from pyinstrument.renderers import SpeedscopeRenderer
+        path.write_text(profiler.output(renderer=SpeedscopeRenderer()), encoding="utf-8")
+    return path
+
+
+@contextmanager
+def profiled(name: str, force: bool = False):
+    """Profile the enclosed block for a sampled fraction of calls (or always, with force=True)."""
+    if not force and (settings.profile_sample_rate <= 0 or random.random() >= settings.profile_sample_rate):
+        yield None
+        return
+    profiler = _new_profiler(async_mode="disabled")
+    if profiler is None:
+        yield None
+        return
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        try:
+            path = _write_profile(profiler, _profile_filename(name))
+            logger.info("Profile for %s written to %s", name, path)
+        except Exception:
+            logger.exception("Could not write profile for %s", name)
+
+
+def _requested_token(scope) -> Optional[str]:
+    for key, value in scope.get("headers", []):
+        if key == PROFILE_HEADER:
+            return value.decode("latin-1")
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    values = query.get(PROFILE_QUERY_PARAM)
+    return values[0] if values else None
+
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware that profiles single requests carrying the admin profiling token."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not is_admin_token(_requested_token(scope)):
+            await self.app(scope, receive, send)
+            return
+
+        profiler = _new_profiler(async_mode="enabled")
+        if profiler is None:
+            await self.app(scope, receive, send)
+            return
+
+        filename = _profile_filename(f"{scope['method']} {scope['path']}")
+        url = f"/profiles/{filename}"
+
+        async def send_with_location(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-url", url.encode("latin-1"))]
+            await send(message)
+
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_location)
+        finally:
+            profiler.stop()
+            try:
+                _write_profile(profiler, filename)
+            except Exception:
+                logger.exception("Could not write profile %s", filename)
@@ -0,0 +1,17 @@
+from typing import Any
+import orjson
+from fastapi.responses import Response
+
+
+def fast_json(content: Any, status_code: int = 200) -> Response:
+    """
+    JSON response encoded directly with orjson, bypassing response_model validation.
+    Only use with data that is already in its final shape (dicts/lists of plain values,
+    UUIDs and datetimes are handled natively).
+    """
+    return Response(content=dumps(content), status_code=status_code, media_type="application/json")
+
+
+def dumps(content: Any) -> bytes:
+    # OPT_UTC_Z matches Pydantic's "Z" suffix for UTC datetimes
+    return orjson.dumps(content, option=orjson.OPT_UTC_Z)
@@ -0,0 +1,17 @@
+from dataclasses import dataclass
+from typing import Any, Optional
+from uuid import UUID
+
+
+@dataclass
+class BulkMutationCommand:
+    operations: list[Any]  # BulkOperation items: op, id, data
+    chunk_size: int = 1000
+
+
+@dataclass
+class BulkItemOutcome:
+    index: int
+    status: str
+    id: Optional[UUID] = None
+    error: Optional[str] = None
@@ -0,0 +1,91 @@
+import logging
+import uuid
+from typing import List, Type
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.domain.commands.bulk_mutation_command import BulkMutationCommand, BulkItemOutcome
+
+logger = logging.getLogger(__name__)
+
+
+class BulkMutationHandler:
+    """
+    Applies a list of create/update/delete operations through a repository's set-based bulk
+    methods, one transaction per chunk. Within a chunk creates run first, then updates, then
+    deletes. If a chunk fails, every operation in it is reported as an error and nothing from
+    that chunk is kept; earlier and later chunks are unaffected.
+    """
+
+    def __init__(self, session: AsyncSession, repo, create_schema: Type[BaseModel],
+                 update_schema: Type[BaseModel], unique_field: str):
+        self.session = session
+        self.repo = repo
+        self.create_schema = create_schema
+        self.update_schema = update_schema
+        self.unique_field = unique_field
+
+    async def handle(self, command: BulkMutationCommand) -> List[BulkItemOutcome]:
+        outcomes = []
+        operations = command.operations
+        for start in range(0, len(operations), command.chunk_size):
+            chunk = list(enumerate(operations[start:start + command.chunk_size], start))
+            outcomes.extend(await self._apply_chunk(chunk))
+        return outcomes
+
+    async def _apply_chunk(self, chunk) -> List[BulkItemOutcome]:
+        outcomes = {}
+        creates, updates, deletes = [], [], []
+
+        for index, operation in chunk:
+            try:
+                if operation.op == "create":
+                    row = self.create_schema.model_validate(operation.data or {}).model_dump()
+                    row["id"] = uuid.uuid4()
+                    creates.append((index, row))
+                elif operation.id is None:
+                    raise ValueError(f"id is required for {operation.op}")
+                elif operation.op == "update":
+                    changes = self.update_schema.model_validate(operation.data or {}).model_dump(exclude_unset=True)
+                    if not changes:
+                        raise ValueError("No fields to update")
+                    updates.append((index, {"id": operation.id, **changes}))
+                else:
+                    deletes.append((index, operation.id))
+            except (ValidationError, ValueError) as e:
+                outcomes[index] = BulkItemOutcome(index, "invalid", operation.id, str(e))
+
+        try:
+            async with self.session.begin():
+                created = await self.repo.bulk_insert([row for _, row in creates])
+                updated = await self.repo.bulk_update([row for _, row in updates])
+                deleted, in_use = await self.repo.bulk_delete([id for _, id in deletes])
+        except Exception as e:
+            # Database errors can quote SQL and row values: log them, and answer with a reference only
+            error_ref = uuid.uuid4().hex[:12]
+            logger.exception("Bulk chunk starting at operation %d failed (ref %s)", chunk[0][0], error_ref)
+            reason = "constraint violation" if isinstance(e, IntegrityError) else "database error"
+            message = f"Chunk failed ({reason}, ref {error_ref}); no operation in it was applied"
+            for index, operation in chunk:
+                outcomes.setdefault(index, BulkItemOutcome(index, "error", operation.id, message))
+            return [outcomes[index] for index, _ in chunk]
+
+        for index, row in creates:
+            if row["id"] in created:
+                outcomes[index] = BulkItemOutcome(index, "created", row["id"])
+            else:
+                outcomes[index] = BulkItemOutcome(
+                    index, "conflict", None, f"{self.unique_field} '{row[self.unique_field]}' already exists"
+                )
+        for index, row in updates:
+            status = "updated" if row["id"] in updated else "not_found"
+            outcomes[index] = BulkItemOutcome(index, status, row["id"])
+        for index, id in deletes:
+            if id in deleted:
+                outcomes[index] = BulkItemOutcome(index, "deleted", id)
+            elif id in in_use:
+                outcomes[index] = BulkItemOutcome(index, "conflict", id, "Still referenced by students")
+            else:
+                outcomes[index] = BulkItemOutcome(index, "not_found", id)
+
+        return [outcomes[index] for index, _ in chunk]
@@ -5,6 +5,7 @@ from sqlalchemy import update, bindparam
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.domain.models.student import Student
 from app.core.config import settings
+from app.core.metrics import PHOTOS_PROCESSED
 
 logger = logging.getLogger(__name__)
 
@@ -62,7 +63,11 @@ class ScanPhotosHandler:
             logger.error(traceback.format_exc())
 
     async def _bulk_update(self, matches: list) -> int:
-        """Helper to perform bulk updates for a batch of matches."""
+        """
+        Helper to perform bulk updates for a batch of matches. Photo files are named by reg_no only,
+        so a candidate registered in several batches gets the photo on every batch's row; the
+        returned count is of rows updated, not files matched.
+        """
         try:
             # Optimized bulk update using bindparam
             stmt = (
@@ -73,6 +78,8 @@ class ScanPhotosHandler:
             
             result = await self.session.execute(stmt, matches)
             await self.session.commit()
+            PHOTOS_PROCESSED.labels("scan", "matched").inc(result.rowcount)
+            PHOTOS_PROCESSED.labels("scan", "unmatched").inc(max(len(matches) - result.rowcount, 0))
             return result.rowcount
         except Exception as e:
             logger.error(f"Bulk update failed: {e}")
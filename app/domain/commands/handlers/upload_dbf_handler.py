@@ -1,12 +1,16 @@
 import uuid
+import logging
 from dbfread import DBF
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import invalidate
 from app.domain.commands.upload_dbf_command import UploadDbfCommand, UploadDbfResult
 from app.domain.models.student import Student
 from app.domain.models.school import School
 from app.domain.models.state import State
 from app.domain.repositories.interfaces import IStudentRepository, ISchoolRepository, IStateRepository
 
+logger = logging.getLogger(__name__)
+
 
 class UploadDbfHandler:
     def __init__(self, student_repo: IStudentRepository, school_repo: ISchoolRepository, 
@@ -80,23 +84,28 @@ class UploadDbfHandler:
                     
                     if not school:
                         missing_school_matches.append(record['REG_NO'])
-                
+            
+            # New batches get their partition first, in a short transaction of their own, as in the
+            # uploads router: the DDL locks `students` exclusively and must not span the import
+            async with self.session.begin():
+                await self.student_repo.ensure_batch_partitions({s.batch for s in students})
+            
+            async with self.session.begin():
                 students_imported = await self.student_repo.bulk_add(students)
-                
-                return UploadDbfResult(
-                    students_imported=students_imported,
-                    schools_imported=schools_imported,
-                    states_imported=states_imported,
-                    missing_fields=[],
-                    missing_school_matches=missing_school_matches
-                )
+            
+            await invalidate("states", "schools", "students")
+            return UploadDbfResult(
+                students_imported=students_imported,
+                schools_imported=schools_imported,
+                states_imported=states_imported,
+                missing_fields=[],
+                missing_school_matches=missing_school_matches
+            )
         except KeyError as e:
-            import traceback
-            traceback.print_exc()
+            logger.exception("DBF import failed: missing column")
             raise ValueError(f"Missing column in DBF file: {str(e)}") from e
         except Exception as e:
-            import traceback
-            traceback.print_exc()
+            logger.exception("DBF import failed")
             # Check if it's an IntegrityError related to foreign key
             error_msg = str(e)
             if 'foreign key constraint' in error_msg.lower() or 'fk_' in error_msg.lower():
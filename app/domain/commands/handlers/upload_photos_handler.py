@@ -1,4 +1,5 @@
 import os
+import logging
 import zipfile
 import rarfile
 from pathlib import Path
@@ -7,6 +8,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.domain.commands.upload_photos_command import UploadPhotosCommand, UploadPhotosResult
 from app.domain.models.student import Student
 from app.core.config import settings
+from app.core.metrics import PHOTOS_PROCESSED
+from app.core.logging_config import WarningAggregator
+
+logger = logging.getLogger(__name__)
 
 
 class UploadPhotosHandler:
@@ -20,6 +25,7 @@ class UploadPhotosHandler:
         saved = 0
         missing_students = []
         errors = []
+        self._file_errors = WarningAggregator(logger)
         
         try:
             # 1. Process Archive if present
@@ -49,14 +55,16 @@ class UploadPhotosHandler:
                         saved += 1
             
             await self.session.commit()
-            print(f"Committed {saved} photos")
+            PHOTOS_PROCESSED.labels("upload", "matched").inc(saved)
+            PHOTOS_PROCESSED.labels("upload", "unmatched").inc(len(missing_students))
+            logger.info("Committed %d photos, %d without a matching student", saved, len(missing_students))
             
         except Exception as e:
-            print(f"Error: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Photo upload failed")
             errors.append(str(e))
             await self.session.rollback()
+        finally:
+            self._file_errors.flush()
         
         return UploadPhotosResult(
             saved=saved,
@@ -70,13 +78,14 @@ class UploadPhotosHandler:
             basename = Path(filename).name
             reg_no = basename.split('.')[0].strip()
             
-            # Find student
+            # Find the candidate's rows: reg_no is unique per batch, and a candidate registered in
+            # several batches has one row in each, all of which get the photo
             result = await self.session.execute(
-                select(Student).where(Student.reg_no.ilike(reg_no))
+                select(Student.id).where(Student.reg_no.ilike(reg_no))
             )
-            student = result.scalar_one_or_none()
+            student_ids = result.scalars().all()
             
-            if not student:
+            if not student_ids:
                 missing_students.append(reg_no)
                 return False
             
@@ -88,10 +97,10 @@ class UploadPhotosHandler:
             # Update DB
             await self.session.execute(
                 update(Student)
-                .where(Student.id == student.id)
+                .where(Student.id.in_(student_ids))
                 .values(photo_path=str(photo_path))
             )
             return True
         except Exception as e:
-            print(f"Error processing {filename}: {e}")
+            self._file_errors.add("photo files could not be processed", f"{filename}: {e}")
             return False
\ No newline at end of file
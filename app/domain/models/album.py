@@ -0,0 +1,21 @@
+from typing import NamedTuple, Optional
+
+
+class AlbumSchool(NamedTuple):
+    """School fields an album needs. Plain tuples: no ORM state, cheap to pickle to render workers."""
+    schnum: str
+    sch_name: str
+    town: Optional[str]
+    custodian: Optional[str]
+    state: str
+    state_name: str
+
+
+class AlbumCandidate(NamedTuple):
+    """Student fields an album needs; attribute-compatible with the ORM Student for the generators."""
+    reg_no: str
+    ser_no: str
+    cand_name: str
+    photo_path: Optional[str]
+    schnum: str
+    batch: str
@@ -0,0 +1,33 @@
+from sqlalchemy import Column, String, Integer, BigInteger, DateTime, Text, Index, text
+from sqlalchemy.sql import func
+from app.core.db import Base
+
+
+class AlbumTask(Base):
+    """One school album to render, claimed by render workers with FOR UPDATE SKIP LOCKED and a lease."""
+    __tablename__ = "album_tasks"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    run_id = Column(String, nullable=False)
+    state_code = Column(String, nullable=False)
+    batch = Column(String, nullable=True)  # None means "All Batches"
+    schnum = Column(String, nullable=False)
+    exam_title = Column(String, nullable=False)
+    # Relative to each worker's ALBUM_OUTPUT_ROOT, so nodes can mount the shared storage anywhere
+    output_path = Column(String, nullable=False)
+    priority = Column(Integer, nullable=False, server_default="0")
+    status = Column(String, nullable=False, server_default="pending")  # pending, running, done, failed
+    attempts = Column(Integer, nullable=False, server_default="0")
+    lease_owner = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index('ix_album_tasks_run_output', 'run_id', 'output_path', unique=True),
+        # Claim order for the pending queue; done/failed rows stay out of the index
+        Index('ix_album_tasks_pending', text('priority DESC'), 'id', postgresql_where=text("status = 'pending'")),
+        Index('ix_album_tasks_lease', 'lease_expires_at', postgresql_where=text("status = 'running'")),
+    )
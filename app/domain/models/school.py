@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
@@ -20,4 +20,8 @@ class School(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
-    state_details = relationship("State", backref="school_list")
\ No newline at end of file
+    state_details = relationship("State", backref="school_list")
+    
+    __table_args__ = (
+        Index('ix_schools_state_schnum', 'state', 'schnum'),
+    )
\ No newline at end of file
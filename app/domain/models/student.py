@@ -10,13 +10,14 @@ class Student(Base):
     __tablename__ = "students"
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    batch = Column(String, nullable=False)
+    # Part of the primary key because students is list-partitioned by batch
+    batch = Column(String, primary_key=True, nullable=False)
     schnum = Column(String, nullable=False)
     sch_name = Column(String, nullable=True)
-    reg_no = Column(String, unique=True, nullable=False, index=True)
+    reg_no = Column(String, nullable=False)
     ser_no = Column(String, nullable=False)
     cand_name = Column(String, nullable=False)
-    school_id = Column(UUID(as_uuid=True), ForeignKey("schools.id"), nullable=True)
+    school_id = Column(UUID(as_uuid=True), ForeignKey("schools.id"), nullable=True, index=True)
     photo_path = Column(String, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -25,4 +26,9 @@ class Student(Base):
     
     __table_args__ = (
         Index('idx_batch_school_reg', 'batch', 'schnum', 'reg_no'),
+        # Unique indexes on a partitioned table must include the partition key
+        Index('ix_students_reg_no', 'reg_no', 'batch', unique=True),
+        Index('ix_students_schnum_ser_no', 'schnum', 'ser_no', 'id',
+              postgresql_include=['reg_no', 'cand_name', 'batch', 'photo_path']),
+        {"postgresql_partition_by": "LIST (batch)"},
     )
\ No newline at end of file
@@ -1,9 +1,11 @@
 from abc import ABC, abstractmethod
-from typing import Optional, List, Tuple
+from typing import Optional, List, Tuple, AsyncIterator, Sequence, Set, Dict
 from uuid import UUID
 from app.domain.models.student import Student
 from app.domain.models.school import School
 from app.domain.models.state import State
+from app.domain.models.album import AlbumCandidate, AlbumSchool
+from app.domain.models.album_task import AlbumTask
 
 
 class StudentFilter:
@@ -16,6 +18,18 @@ class StudentFilter:
         self.state_name = state_name
         self.cand_name = cand_name
         self.reg_no = reg_no
+    
+    def cache_key(self) -> tuple:
+        """Normalized key: empty filters are dropped and substring (ilike) filters are case-folded."""
+        def norm(value: Optional[str], fold: bool = False) -> Optional[str]:
+            if not value:
+                return None
+            return value.lower() if fold else value
+        
+        return (
+            norm(self.schnum), norm(self.sch_name, True), norm(self.batch),
+            norm(self.state_name, True), norm(self.cand_name, True), norm(self.reg_no, True),
+        )
 
 
 class IStudentRepository(ABC):
@@ -27,6 +41,18 @@ class IStudentRepository(ABC):
     async def bulk_add(self, students: List[Student]) -> int:
         pass
     
+    @abstractmethod
+    async def bulk_insert(self, rows: List[dict]) -> Set[UUID]:
+        pass
+    
+    @abstractmethod
+    async def bulk_update(self, rows: List[dict]) -> Set[UUID]:
+        pass
+    
+    @abstractmethod
+    async def bulk_delete(self, ids: List[UUID]) -> Tuple[Set[UUID], Set[UUID]]:
+        pass
+    
     @abstractmethod
     async def get_by_id(self, id: UUID) -> Optional[Student]:
         pass
@@ -35,10 +61,80 @@ class IStudentRepository(ABC):
     async def find(self, filters: StudentFilter, limit: int, offset: int) -> Tuple[int, List[Student]]:
         pass
     
+    @abstractmethod
+    async def find_page(self, filters: StudentFilter, limit: int, offset: int = 0,
+                        after: Optional[Tuple[str, str, UUID]] = None) -> List[Student]:
+        pass
+    
+    @abstractmethod
+    async def find_rows(self, filters: StudentFilter, limit: int, offset: int = 0,
+                        after: Optional[Tuple[str, str, UUID]] = None) -> List[Sequence]:
+        pass
+    
+    @abstractmethod
+    async def count(self, filters: StudentFilter, estimate: bool = False) -> Tuple[int, bool]:
+        pass
+    
+    @abstractmethod
+    async def find_by_state(self, state_code: str, batch: Optional[str] = None) -> List[Sequence]:
+        pass
+    
+    @abstractmethod
+    async def find_by_reg_nos(self, reg_nos: Sequence[str], batch: Optional[str] = None) -> List[Sequence]:
+        pass
+    
+    @abstractmethod
+    async def find_album_candidates(self, state_code: Optional[str] = None, batch: Optional[str] = None,
+                                    school_id: Optional[UUID] = None, schnum: Optional[str] = None
+                                    ) -> Tuple[List[AlbumCandidate], Dict[str, AlbumSchool]]:
+        pass
+    
+    @abstractmethod
+    async def list_album_schnums(self, state_code: Optional[str] = None, batch: Optional[str] = None) -> List[str]:
+        pass
+    
+    @abstractmethod
+    async def count_album_schools(self, state_code: Optional[str] = None, batch: Optional[str] = None) -> int:
+        pass
+    
+    @abstractmethod
+    def stream_album_groups(self, state_code: Optional[str] = None, batch: Optional[str] = None,
+                            chunk_size: int = 2000
+                            ) -> AsyncIterator[Tuple[str, Optional[AlbumSchool], List[AlbumCandidate]]]:
+        pass
+    
+    @abstractmethod
+    def stream_by_state(self, state_code: str, batch: Optional[str] = None,
+                        chunk_size: int = 1000) -> AsyncIterator[Sequence]:
+        pass
+    
+    @abstractmethod
+    def stream_export(self, fields: Sequence[str], state: Optional[str] = None,
+                      batch: Optional[str] = None, schnum: Optional[str] = None,
+                      chunk_size: int = 10000) -> AsyncIterator[Sequence]:
+        pass
+    
     @abstractmethod
     async def delete_all(self) -> int:
         pass
     
+    @abstractmethod
+    async def delete_scoped(self, state: Optional[str] = None, batch: Optional[str] = None,
+                            schnum: Optional[str] = None) -> int:
+        pass
+    
+    @abstractmethod
+    async def analyze(self) -> None:
+        pass
+    
+    @abstractmethod
+    async def ensure_batch_partitions(self, batches: Set[str]) -> List[str]:
+        pass
+    
+    @abstractmethod
+    async def archive_batch(self, batch: str) -> Optional[str]:
+        pass
+    
     @abstractmethod
     async def update(self, student: Student) -> Student:
         pass
@@ -57,6 +153,18 @@ class ISchoolRepository(ABC):
     async def bulk_upsert(self, schools: List[School], valid_state_codes: set = None) -> int:
         pass
     
+    @abstractmethod
+    async def bulk_insert(self, rows: List[dict]) -> Set[UUID]:
+        pass
+    
+    @abstractmethod
+    async def bulk_update(self, rows: List[dict]) -> Set[UUID]:
+        pass
+    
+    @abstractmethod
+    async def bulk_delete(self, ids: List[UUID]) -> Tuple[Set[UUID], Set[UUID]]:
+        pass
+    
     @abstractmethod
     async def get_by_id(self, id: UUID) -> Optional[School]:
         pass
@@ -67,7 +175,8 @@ class ISchoolRepository(ABC):
     
     @abstractmethod
     async def find_all(self, schnum: Optional[str] = None, state: Optional[str] = None, 
-                      sch_name: Optional[str] = None) -> List[School]:
+                      sch_name: Optional[str] = None, fields: Optional[Sequence[str]] = None,
+                      limit: Optional[int] = None, after: Optional[str] = None) -> List[School]:
         pass
     
     @abstractmethod
@@ -110,4 +219,38 @@ class IStateRepository(ABC):
     
     @abstractmethod
     async def delete_by_code(self, code: str) -> bool:
-        pass
\ No newline at end of file
+        pass
+
+
+class IAlbumTaskRepository(ABC):
+    @abstractmethod
+    async def enqueue(self, tasks: Sequence[dict]) -> int:
+        pass
+    
+    @abstractmethod
+    async def claim(self, worker_id: str, limit: int, lease_seconds: int) -> List[AlbumTask]:
+        pass
+    
+    @abstractmethod
+    async def heartbeat(self, worker_id: str, task_ids: Sequence[int], lease_seconds: int) -> Set[int]:
+        pass
+    
+    @abstractmethod
+    async def complete(self, task_id: int, worker_id: str) -> bool:
+        pass
+    
+    @abstractmethod
+    async def fail(self, task_id: int, worker_id: str, error: str, max_attempts: int) -> bool:
+        pass
+    
+    @abstractmethod
+    async def reclaim_expired(self, max_attempts: int) -> int:
+        pass
+    
+    @abstractmethod
+    async def requeue_failed(self, run_id: str) -> int:
+        pass
+    
+    @abstractmethod
+    async def run_summary(self, run_id: str) -> List[Sequence]:
+        pass
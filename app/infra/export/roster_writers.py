@@ -0,0 +1,129 @@
+import csv
+import io
+from typing import List, Sequence
+
+# Export columns that are not plain strings
+BOOLEAN_FIELDS = {"has_photo", "photo_exists"}
+
+
+class _ChunkSink:
+    """Write-only file object that buffers bytes until drained; lets pyarrow writers stream."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class CsvRosterWriter:
+    media_type = "text/csv"
+    extension = "csv"
+
+    def __init__(self, fields: Sequence[str]):
+        self.fields = list(fields)
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+
+    def _drain(self) -> bytes:
+        data = self._buffer.getvalue().encode("utf-8")
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return data
+
+    def begin(self) -> bytes:
+        self._writer.writerow(self.fields)
+        return self._drain()
+
+    def write_batch(self, rows: Sequence[Sequence]) -> bytes:
+        self._writer.writerows(rows)
+        return self._drain()
+
+    def finish(self) -> bytes:
+        return b""
+
+
+class _ArrowRosterWriter:
+    def __init__(self, fields: Sequence[str]):
+        import pyarrow as pa  # optional dependency, see requirements.txt
+
+        self._pa = pa
+        self.fields = list(fields)
+        self.schema = pa.schema([
+            (name, pa.bool_() if name in BOOLEAN_FIELDS else pa.string()) for name in self.fields
+        ])
+        self._sink = _ChunkSink()
+        self._writer = None
+
+    def _open(self):
+        raise NotImplementedError
+
+    def begin(self) -> bytes:
+        self._writer = self._open()
+        return self._sink.drain()
+
+    def write_batch(self, rows: Sequence[Sequence]) -> bytes:
+        if not rows:
+            return b""
+        columns = list(zip(*rows))
+        batch = self._pa.record_batch(
+            [self._pa.array(values, type=field.type) for values, field in zip(columns, self.schema)],
+            schema=self.schema
+        )
+        self._write(batch)
+        return self._sink.drain()
+
+    def _write(self, batch):
+        self._writer.write_batch(batch)
+
+    def finish(self) -> bytes:
+        self._writer.close()
+        return self._sink.drain()
+
+
+class ArrowRosterWriter(_ArrowRosterWriter):
+    """Arrow IPC stream format; each fetched batch becomes one record batch."""
+    media_type = "application/vnd.apache.arrow.stream"
+    extension = "arrow"
+
+    def _open(self):
+        return self._pa.ipc.new_stream(self._sink, self.schema)
+
+
+class ParquetRosterWriter(_ArrowRosterWriter):
+    """Parquet file; each fetched batch becomes one row group, the footer is sent last."""
+    media_type = "application/vnd.apache.parquet"
+    extension = "parquet"
+
+    def _open(self):
+        import pyarrow.parquet as pq
+        return pq.ParquetWriter(self._sink, self.schema)
+
+    def _write(self, batch):
+        self._writer.write_table(self._pa.Table.from_batches([batch]))
+
+
+ROSTER_WRITERS = {
+    "csv": CsvRosterWriter,
+    "arrow": ArrowRosterWriter,
+    "parquet": ParquetRosterWriter,
+}
@@ -1,5 +1,7 @@
 import os
+import logging
 import textwrap
+from contextlib import nullcontext
 from pathlib import Path
 from typing import List, Dict, Any
 from reportlab.lib.pagesizes import A4
@@ -9,21 +11,30 @@ from reportlab.pdfgen import canvas
 from reportlab.graphics.barcode import code128, qr
 from reportlab.graphics.shapes import Drawing
 from reportlab.graphics import renderPDF
-from reportlab.platypus import Table, TableStyle, Image, Paragraph
+from reportlab.platypus import Table, TableStyle, Image
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.enums import TA_CENTER, TA_LEFT
 from PIL import Image as PILImage
-from app.domain.models.student import Student
-from app.domain.models.school import School
+from app.domain.models.album import AlbumCandidate, AlbumSchool
 from app.core.config import settings
+from app.core.metrics import ALBUMS_RENDERED, ALBUM_PAGES_RENDERED, time_stage
+from app.core.logging_config import WarningAggregator
+from app.infra.pdf.journal import atomic_output
+from app.infra.pdf.text_fit import draw_fitted, fit_text
+
+logger = logging.getLogger(__name__)
 
 
 class DiskPDFGenerator:
-    def __init__(self):
+    def __init__(self, write_slots=None):
+        # Optional semaphore (e.g. shared between render processes) capping concurrent PDF writes
+        self._write_slots = write_slots
         self.width, self.height = A4
         self.styles = getSampleStyleSheet()
         self.neco_green = colors.Color(0, 0.506, 0.212)
         self.neco_yellow = colors.Color(1, 0.808, 0)
+        # Photo problems are summarised once per album instead of logged per student
+        self._photo_warnings = WarningAggregator(logger)
         self._setup_custom_styles()
 
     def _setup_custom_styles(self):
@@ -72,27 +83,42 @@ class DiskPDFGenerator:
             fontName='Helvetica'
         )
 
-    def generate_school_album(self, school: School, students: List[Student], exam_title: str, output_path: str):
-        """Generates a PDF album for a single school."""
-        c = canvas.Canvas(output_path, pagesize=A4)
-        
-        # 1. Page 1: Front Page
-        self._draw_front_page(c, school, exam_title)
-        c.showPage()
-        
-        # 2. Student Grid Pages
-        students_per_page = 9
-        total_pages = (len(students) + students_per_page - 1) // students_per_page
-        
-        for i in range(0, len(students), students_per_page):
-            batch = students[i:i + students_per_page]
-            page_num = (i // students_per_page) + 1
-            self._draw_grid_page(c, school, batch, page_num, total_pages)
-            c.showPage()
-            
-        c.save()
+    def generate_school_album(self, school: AlbumSchool, students: List[AlbumCandidate], exam_title: str, output_path: str):
+        """
+        Generates a PDF album for a single school. The PDF is written to a `.part` file beside output_path and
+        renamed into place when complete, so output_path never holds a partial album.
+        """
+        try:
+            with atomic_output(output_path) as part_path:
+                c = canvas.Canvas(part_path, pagesize=A4)
+                
+                # 1. Page 1: Front Page
+                with time_stage("front_page"):
+                    self._draw_front_page(c, school, exam_title)
+                    c.showPage()
+                
+                # 2. Student Grid Pages
+                students_per_page = 9
+                total_pages = (len(students) + students_per_page - 1) // students_per_page
+                
+                with time_stage("grid_pages"):
+                    for i in range(0, len(students), students_per_page):
+                        batch = students[i:i + students_per_page]
+                        page_num = (i // students_per_page) + 1
+                        self._draw_grid_page(c, school, batch, page_num, total_pages)
+                        c.showPage()
+                
+                with self._write_slots or nullcontext(), time_stage("save"):
+                    c.save()
+        except Exception:
+            ALBUMS_RENDERED.labels("disk", "failed").inc()
+            raise
+        finally:
+            self._photo_warnings.flush()
+        ALBUMS_RENDERED.labels("disk", "ok").inc()
+        ALBUM_PAGES_RENDERED.labels("disk").inc(total_pages + 1)
 
-    def _draw_front_page(self, c: canvas.Canvas, school: School, exam_title: str):
+    def _draw_front_page(self, c: canvas.Canvas, school: AlbumSchool, exam_title: str):
         # Draw L-shaped borders (Green and Yellow) - Left and Bottom ONLY
         border_width = 15 * mm 
         green_thickness = 5 * mm
@@ -184,7 +210,7 @@ class DiskPDFGenerator:
         c.setFont("Helvetica-Bold", 10)
         c.drawCentredString(badge_x + badge_w/2, badge_y + 3*mm, "SCHOOL COPY")
 
-    def _draw_grid_page(self, c: canvas.Canvas, school: School, students: List[Student], page_num: int, total_pages: int):
+    def _draw_grid_page(self, c: canvas.Canvas, school: AlbumSchool, students: List[AlbumCandidate], page_num: int, total_pages: int):
         c.setFillColor(colors.black)
         
         # Header: labels match 112.png
@@ -223,7 +249,7 @@ class DiskPDFGenerator:
         c.setFont("Helvetica", 8)
         c.drawRightString(self.width - 15*mm, 10*mm, f"{page_num} of {total_pages}")
 
-    def _draw_student_cell(self, c: canvas.Canvas, student: Student, x: float, y: float, w: float, h: float):
+    def _draw_student_cell(self, c: canvas.Canvas, student: AlbumCandidate, x: float, y: float, w: float, h: float):
         # Cell border
         c.setStrokeColor(colors.black)
         c.setLineWidth(1.0)
@@ -269,12 +295,11 @@ class DiskPDFGenerator:
                     # Optimization: Stop once we find a valid photo
                     break
                 except Exception as e:
-                    print(f"Error drawing photo from {p_path}: {e}")
-                    pass
+                    self._photo_warnings.add(f"unreadable photos in school {student.schnum}", f"{p_path}: {e}")
         
         if not photo_drawn and student.photo_path:
-            # Only print log if we expected a photo (DB had one) but failed to find it anywhere
-            print(f"Warning: Photo for {student.reg_no} not found. DB said: {student.photo_path}. Checked fallbacks.")
+            # Only warn if we expected a photo (DB had one) but failed to find it anywhere
+            self._photo_warnings.add(f"missing photos in school {student.schnum}", student.reg_no)
         
         if not photo_drawn and placeholder_path.exists():
             try:
@@ -323,17 +348,20 @@ class DiskPDFGenerator:
         c.setFont("Helvetica-Bold", 9)
         c.drawString(x + 2*mm, details_y, "Name")
         
-        # Wrap name
-        p = Paragraph(student.cand_name.upper(), self.cell_value_style)
-        aw, ah = p.wrap(w - 20*mm, 15*mm)
-        p.drawOn(c, x + 18*mm, details_y - ah + 2*mm)
+        # Wrap name between the label line and the barcode, shrinking very long names to fit
+        name_top = details_y + 2*mm
+        barcode_y = y + 2*mm  # Slightly more padding from bottom
+        barcode_height = 8*mm
+        style = self.cell_value_style
+        name = fit_text((student.cand_name or "").upper(), style.fontName, style.fontSize, style.leading,
+                        w - 20*mm, name_top - (barcode_y + barcode_height))
+        draw_fitted(c, name, style.fontName, x + 18*mm, name_top)
         
         # Barcode (Code128) - Compact size
         barcode = code128.Code128(
             student.reg_no, 
-            barHeight=8*mm,  # Compact height
+            barHeight=barcode_height,  # Compact height
             barWidth=0.4*mm,  # Standard bar width
             humanReadable=False  # No text below barcode
         )
-        barcode_y = y + 2*mm  # Slightly more padding from bottom
         barcode.drawOn(c, x + (w - barcode.width)/2, barcode_y)
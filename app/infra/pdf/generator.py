@@ -1,83 +1,157 @@
+import io
+import logging
+import math
+from functools import lru_cache
 from pathlib import Path
-from typing import List
+from typing import List, NamedTuple, Optional, Tuple
 from reportlab.lib.pagesizes import A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Image, Paragraph
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib import colors
 from reportlab.lib.units import inch
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfgen import canvas
 from PIL import Image as PILImage
-from app.domain.models.student import Student
+from app.domain.models.album import AlbumCandidate
+from app.core.metrics import ALBUMS_RENDERED, ALBUM_PAGES_RENDERED, time_stage
+from app.infra.pdf.text_fit import draw_fitted, fit_text
+
+logger = logging.getLogger(__name__)
+
+# Page and cell metrics of the original SimpleDocTemplate/Table layout, kept so albums look the same
+PAGE_MARGIN = inch
+FRAME_PADDING = 6
+CELL_WIDTH = 2 * inch
+CELL_HEIGHT = 2.5 * inch
+CELL_PAD_X = 6
+CELL_PAD_Y = 3
+PHOTO_SIZE = 1.2 * inch
+THUMBNAIL_PX = (120, 120)
+FONT = "Helvetica"
+FONT_BOLD = "Helvetica-Bold"
+FONT_SIZE = 10
+LEADING = 12
+
+
+class GridGeometry(NamedTuple):
+    cols: int
+    rows: int
+    left: float  # x of the grid's left edge
+    top: float  # y of the first row's top edge on every page
+    rows_per_page: int
+
+
+def parse_layout(layout: str) -> Tuple[int, int]:
+    """'grid_3x4' -> (3 columns, 4 rows)."""
+    try:
+        cols, rows = map(int, layout.split("_")[1].split("x"))
+    except (IndexError, ValueError):
+        cols = rows = 0
+    if cols < 1 or rows < 1:
+        raise ValueError(f"Invalid layout '{layout}', expected grid_<columns>x<rows>")
+    return cols, rows
+
+
+@lru_cache(maxsize=32)
+def grid_geometry(cols: int, rows: int) -> GridGeometry:
+    """
+    Placement of a cols x rows grid of 2in x 2.5in cells, as the old platypus tables laid it out: centred
+    in the A4 frame, with the tables flowing on from page to page and splitting between rows, so a page
+    holds as many rows as fit in the frame (3) whichever grid they belong to.
+    """
+    page_width, page_height = A4
+    frame_width = page_width - 2 * PAGE_MARGIN - 2 * FRAME_PADDING
+    frame_height = page_height - 2 * PAGE_MARGIN - 2 * FRAME_PADDING
+    left = PAGE_MARGIN + FRAME_PADDING + (frame_width - cols * CELL_WIDTH) / 2
+    top = page_height - PAGE_MARGIN - FRAME_PADDING
+    return GridGeometry(cols, rows, left, top, max(1, int(frame_height // CELL_HEIGHT)))
 
 
 class PDFGenerator:
+    """
+    Grid albums (`grid_<columns>x<rows>`) drawn straight onto a canvas with the cell size and
+    pagination of the old table layout; geometry is computed once per layout and photo thumbnails
+    are kept in memory.
+    """
+
     def __init__(self):
         self.page_width, self.page_height = A4
-        self.styles = getSampleStyleSheet()
-    
-    def generate_album(self, students: List[Student], output_path: str, 
-                      layout: str = "grid_3x4") -> str:
-        doc = SimpleDocTemplate(output_path, pagesize=A4)
-        story = []
-        
-        # Parse layout
-        cols, rows = map(int, layout.split('_')[1].split('x'))
-        students_per_page = cols * rows
-        
-        # Process students in batches
-        for i in range(0, len(students), students_per_page):
-            batch = students[i:i + students_per_page]
-            
-            # Create table data
-            table_data = []
-            for row in range(rows):
-                row_data = []
-                for col in range(cols):
-                    idx = row * cols + col
-                    if idx < len(batch):
-                        student = batch[idx]
-                        cell_content = self._create_student_cell(student)
-                        row_data.append(cell_content)
-                    else:
-                        row_data.append("")
-                table_data.append(row_data)
-            
-            # Create table
-            table = Table(table_data, colWidths=[2*inch]*cols, rowHeights=[2.5*inch]*rows)
-            table.setStyle(TableStyle([
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                ('FONTSIZE', (0, 0), (-1, -1), 8),
-            ]))
-            
-            story.append(table)
-        
-        doc.build(story)
+
+    def generate_album(self, students: List[AlbumCandidate], output_path: str,
+                       layout: str = "grid_3x4") -> str:
+        g = grid_geometry(*parse_layout(layout))
+        # Every grid is drawn in full, so the last one has empty trailing cells as the old tables did
+        total_rows = math.ceil(len(students) / (g.cols * g.rows)) * g.rows
+        pages = 0
+        try:
+            with time_stage("build"):
+                c = canvas.Canvas(output_path, pagesize=A4)
+                for first_row in range(0, total_rows, g.rows_per_page):
+                    page_rows = min(g.rows_per_page, total_rows - first_row)
+                    self._draw_grid(c, g, page_rows)
+                    for slot in range(page_rows):
+                        y = g.top - (slot + 1) * CELL_HEIGHT
+                        start = (first_row + slot) * g.cols
+                        for col, student in enumerate(students[start:start + g.cols]):
+                            self._draw_student_cell(c, student, g.left + col * CELL_WIDTH, y,
+                                                    CELL_WIDTH, CELL_HEIGHT)
+                    c.showPage()
+                    pages += 1
+                c.save()
+        except Exception:
+            ALBUMS_RENDERED.labels("api", "failed").inc()
+            raise
+        ALBUMS_RENDERED.labels("api", "ok").inc()
+        ALBUM_PAGES_RENDERED.labels("api").inc(pages)
         return output_path
-    
-    def _create_student_cell(self, student: Student) -> List:
-        content = []
-        
-        # Add photo
-        if student.photo_path and Path(student.photo_path).exists():
-            try:
-                # Resize image
-                img = PILImage.open(student.photo_path)
-                img.thumbnail((120, 120))
-                temp_path = f"/tmp/{student.reg_no}_thumb.jpg"
-                img.save(temp_path)
-                content.append(Image(temp_path, width=1.2*inch, height=1.2*inch))
-            except:
-                content.append(Paragraph("No Photo", self.styles['Normal']))
+
+    def _draw_grid(self, c: canvas.Canvas, g: GridGeometry, rows: int):
+        c.setLineWidth(1)
+        c.setStrokeColorRGB(0, 0, 0)
+        right = g.left + g.cols * CELL_WIDTH
+        bottom = g.top - rows * CELL_HEIGHT
+        for col in range(g.cols + 1):
+            x = g.left + col * CELL_WIDTH
+            c.line(x, bottom, x, g.top)
+        for row in range(rows + 1):
+            y = g.top - row * CELL_HEIGHT
+            c.line(g.left, y, right, y)
+
+    def _thumbnail(self, photo_path: Optional[str]) -> Optional[ImageReader]:
+        if not photo_path or not Path(photo_path).exists():
+            return None
+        try:
+            with PILImage.open(photo_path) as img:
+                # JPEGs decode straight at a reduced scale instead of full size, then get resized
+                img.draft("RGB", THUMBNAIL_PX)
+                img.thumbnail(THUMBNAIL_PX)
+                buffer = io.BytesIO()
+                img.convert("RGB").save(buffer, format="JPEG")
+        except Exception as e:
+            logger.debug("Could not load photo %s: %s", photo_path, e)
+            return None
+        buffer.seek(0)
+        return ImageReader(buffer)
+
+    def _draw_student_cell(self, c: canvas.Canvas, student: AlbumCandidate,
+                           x: float, y: float, w: float, h: float):
+        photo = self._thumbnail(student.photo_path)
+        photo_height = PHOTO_SIZE if photo else LEADING
+        details = [f"Reg: {student.reg_no}", f"Ser: {student.ser_no}"]
+        # The name gets whatever height the photo and the two detail lines leave
+        name = fit_text(student.cand_name or "", FONT_BOLD, FONT_SIZE, LEADING, w - 2 * CELL_PAD_X,
+                        h - 2 * CELL_PAD_Y - photo_height - len(details) * LEADING)
+        name_height = name.height or LEADING
+
+        # Photo (or "No Photo") above the details, the pair centred vertically in the padded cell
+        content_height = photo_height + name_height + len(details) * LEADING
+        top = y + CELL_PAD_Y + (h - 2 * CELL_PAD_Y + content_height) / 2
+        if photo:
+            c.drawImage(photo, x + (w - PHOTO_SIZE) / 2, top - PHOTO_SIZE, width=PHOTO_SIZE, height=PHOTO_SIZE)
         else:
-            content.append(Paragraph("No Photo", self.styles['Normal']))
-        
-        # Add student info
-        info = f"""
-        <b>{student.cand_name}</b><br/>
-        Reg: {student.reg_no}<br/>
-        Ser: {student.ser_no}
-        """
-        content.append(Paragraph(info, self.styles['Normal']))
-        
-        return content
\ No newline at end of file
+            c.setFont(FONT, FONT_SIZE)
+            c.drawString(x + CELL_PAD_X, top - FONT_SIZE, "No Photo")
+
+        draw_fitted(c, name, FONT_BOLD, x + CELL_PAD_X, top - photo_height)
+        c.setFont(FONT, FONT_SIZE)
+        baseline = top - photo_height - name_height - FONT_SIZE
+        for text in details:
+            c.drawString(x + CELL_PAD_X, baseline, text)
+            baseline -= LEADING
@@ -0,0 +1,139 @@
+"""
+Crash safety for album runs that write many PDFs into one directory.
+
+- atomic_output(path) hands out a `<name>.<random>.part` file next to the target and renames it
+  over the target only once it is completely written and synced, so a `.pdf` on disk is always whole.
+  Only stale `.part` files are swept: another run or worker may be writing into the same directory.
+- RunJournal appends one JSON line per finished school; a resumed run skips the schools it lists
+  whose PDF is still present with the recorded size.
+"""
+import json
+import logging
+import os
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+PART_SUFFIX = ".part"
+# A part file lives only while one PDF is saved and synced; anything older was left by a killed writer
+PARTIAL_STALE_SECONDS = 15 * 60
+
+
+def _fsync_file(path: Path) -> None:
+    with open(path, "rb") as f:
+        os.fsync(f.fileno())
+
+
+def _fsync_dir(directory: Path) -> None:
+    # Makes the rename itself durable; not supported on Windows, where replace is already durable enough
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def atomic_output(path: str) -> Iterator[str]:
+    """Yield a temporary path to write to; it replaces `path` only if the block succeeds."""
+    target = Path(path)
+    # Unique per writer: after a lost lease two workers can briefly render the same album
+    part = target.with_name(f"{target.name}.{uuid.uuid4().hex[:8]}{PART_SUFFIX}")
+    try:
+        yield str(part)
+        _fsync_file(part)
+        os.replace(part, target)
+    except BaseException:
+        part.unlink(missing_ok=True)
+        raise
+    _fsync_dir(target.parent)
+
+
+def remove_partials(directory: Path, min_age: float = PARTIAL_STALE_SECONDS) -> int:
+    """Delete `.part` files left behind by a writer that was killed mid-write, leaving recent ones alone."""
+    removed = 0
+    cutoff = time.time() - min_age
+    for part in directory.glob(f"*{PART_SUFFIX}"):
+        try:
+            if part.stat().st_mtime > cutoff:
+                continue
+            part.unlink()
+            removed += 1
+        except OSError as e:
+            logger.warning("Could not remove partial file %s: %s", part, e)
+    return removed
+
+
+class RunJournal:
+    """Append-only JSONL checkpoint of the schools a run has finished, kept in the output directory."""
+
+    def __init__(self, directory: Path, run_key: str, params: Dict[str, Optional[str]]):
+        safe_key = "".join(ch if ch.isalnum() or ch in "-_" else "_" for ch in run_key)
+        self.path = directory / f".album_run_{safe_key}.jsonl"
+        self.params = params
+
+    def _read(self) -> Optional[Dict[str, int]]:
+        """Finished schools from an existing journal, or None if it belongs to a different run."""
+        done: Dict[str, int] = {}
+        with open(self.path, encoding="utf-8") as f:
+            for line_no, line in enumerate(f):
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    entry = None
+                if line_no == 0:
+                    if not isinstance(entry, dict) or entry.get("params") != self.params:
+                        return None
+                    continue
+                if not isinstance(entry, dict) or "schnum" not in entry or "size" not in entry:
+                    # A crash can leave the last line half written
+                    logger.warning("Ignoring unreadable line %d in %s", line_no + 1, self.path)
+                    continue
+                done[entry["schnum"]] = entry["size"]
+        return done
+
+    def open(self, resume: bool) -> Set[str]:
+        """
+        Start the journal. With resume=True, returns the schnums whose PDF is already complete;
+        otherwise (or if the journal is for other parameters) starts a fresh journal.
+        """
+        done = None
+        if resume and self.path.exists():
+            done = self._read()
+            if done is None:
+                logger.warning("Journal %s is for a different run; starting from the first school", self.path)
+        if done is None:
+            with open(self.path, "w", encoding="utf-8") as f:
+                f.write(json.dumps({"params": self.params, "started": time.strftime("%Y-%m-%dT%H:%M:%S")}) + "\n")
+            done = {}
+        else:
+            # Terminate a half-written last line so the next record starts on its own line
+            with open(self.path, "rb+") as f:
+                if f.seek(0, os.SEEK_END):
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        f.write(b"\n")
+
+        # A journalled school only counts if its PDF is still there, unchanged
+        finished = set()
+        for schnum, size in done.items():
+            pdf = self.path.parent / f"{schnum}.pdf"
+            if pdf.is_file() and pdf.stat().st_size == size:
+                finished.add(schnum)
+        return finished
+
+    def record(self, schnum: str, output_path: str) -> None:
+        size = os.path.getsize(output_path)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"schnum": schnum, "size": size}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
@@ -0,0 +1,46 @@
+"""
+Process pool for rendering school albums off the event loop, shared by nationwide runs and the
+queue worker. Each process keeps one DiskPDFGenerator; a cross-process semaphore caps how many
+of them write a PDF at once (ALBUM_DISK_WRITERS).
+"""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+from app.core.config import settings
+from app.core.logging_config import setup_logging
+from app.core.profiling import profiled
+from app.domain.models.album import AlbumCandidate, AlbumSchool
+from app.infra.pdf.disk_generator import DiskPDFGenerator
+
+_generator: Optional[DiskPDFGenerator] = None
+
+
+def _init_worker(write_slots) -> None:
+    global _generator
+    setup_logging()
+    _generator = DiskPDFGenerator(write_slots=write_slots)
+
+
+def render_pool(workers: int) -> ProcessPoolExecutor:
+    # Spawned, not forked: the parent has a running event loop, threads and DB connections
+    context = multiprocessing.get_context("spawn")
+    write_slots = context.BoundedSemaphore(settings.album_disk_writers)
+    return ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker, initargs=(write_slots,))
+
+
+def render_school(school: Optional[AlbumSchool], students: List[AlbumCandidate], exam_title: str,
+                  output_path: str, profile_name: str) -> None:
+    """Runs in a pool process."""
+    with profiled(profile_name):
+        _generator.generate_school_album(
+            school=school, students=students, exam_title=exam_title, output_path=output_path
+        )
+
+
+def album_subdir(state_name: str, batch: Optional[str], per_batch: bool) -> Path:
+    """
+    Where a state's albums go under the output root. With `per_batch` each batch gets its own directory;
+    needed when one run writes several batches of a state, which would overwrite each other's {schnum}.pdf.
+    """
+    return Path(state_name) / batch if per_batch and batch else Path(state_name)
@@ -0,0 +1,256 @@
+"""
+Nationwide album runs: every school of many states (and batches) rendered on one bounded process pool.
+
+- The unit of work is one school. Each (state, batch) has its own queue of schools; the dispatcher
+  serves the highest-priority states first and round-robins between states of equal priority, so
+  every state makes progress instead of waiting for the ones before it.
+- ALBUM_WORKERS caps render processes, ALBUM_DB_CONCURRENCY caps concurrent candidate queries and
+  ALBUM_DISK_WRITERS caps how many processes write a PDF at the same time.
+- Output, journals and resume work as in generate-to-disk, one directory per state.
+- Progress lives in the memory of the API process that started the run.
+"""
+import asyncio
+import logging
+import os
+import time
+import uuid
+from collections import deque
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.core.config import settings
+from app.core.logging_config import async_job_log
+from app.core.metrics import QUEUE_DEPTH
+from app.domain.models.state import State
+from app.infra.pdf.journal import RunJournal, remove_partials
+from app.infra.pdf.render_pool import album_subdir, render_pool, render_school
+from app.infra.repositories.sqlalchemy_repositories import StudentRepository
+from app.schemas.album_schema import NationwideAlbumRequest
+
+logger = logging.getLogger(__name__)
+
+# Each worker keeps this many schools queued so it never idles while the next school is fetched
+PREFETCH_PER_WORKER = 2
+
+
+@dataclass
+class StateProgress:
+    state_code: str
+    state_name: str
+    batch: Optional[str]
+    output_directory: str
+    total: int = 0
+    generated: int = 0
+    skipped: int = 0
+    failed: int = 0
+    failed_schools: List[dict] = field(default_factory=list)
+
+    @property
+    def done(self) -> int:
+        return self.generated + self.skipped + self.failed
+
+
+@dataclass
+class NationwideRun:
+    run_id: str
+    status: str = "pending"  # pending, running, finished, failed
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+    students_rendered: int = 0
+    states: Dict[str, StateProgress] = field(default_factory=dict)
+
+    def snapshot(self) -> dict:
+        end = self.finished_at or time.time()
+        elapsed = end - self.started_at if self.started_at else 0.0
+        generated = sum(p.generated for p in self.states.values())
+        return {
+            "run_id": self.run_id,
+            "status": self.status,
+            "error": self.error,
+            "elapsed_seconds": round(elapsed, 1),
+            "schools_total": sum(p.total for p in self.states.values()),
+            "schools_done": sum(p.done for p in self.states.values()),
+            "schools_generated": generated,
+            "schools_failed": sum(p.failed for p in self.states.values()),
+            "schools_per_minute": round(generated * 60 / elapsed, 1) if elapsed else 0.0,
+            "students_per_second": round(self.students_rendered / elapsed, 1) if elapsed else 0.0,
+            "states": [
+                {
+                    "state_code": p.state_code,
+                    "state_name": p.state_name,
+                    "batch": p.batch,
+                    "total": p.total,
+                    "generated": p.generated,
+                    "skipped": p.skipped,
+                    "failed": p.failed,
+                    "failed_schools": p.failed_schools[:10],
+                    "output_directory": p.output_directory,
+                }
+                for p in self.states.values()
+            ],
+        }
+
+
+_runs: Dict[str, NationwideRun] = {}
+
+
+def create_run() -> NationwideRun:
+    run = NationwideRun(run_id=uuid.uuid4().hex[:12])
+    _runs[run.run_id] = run
+    return run
+
+
+def get_run(run_id: str) -> Optional[NationwideRun]:
+    return _runs.get(run_id)
+
+
+def list_runs() -> List[NationwideRun]:
+    return sorted(_runs.values(), key=lambda run: run.created_at, reverse=True)
+
+
+@dataclass
+class _Unit:
+    """One (state, batch) of a run: its progress, journal and the schools still to render."""
+    progress: StateProgress
+    journal: RunJournal
+    directory: Path
+    pending: Deque[str]
+
+
+def interleave(units: List[_Unit], priorities: Dict[str, int]) -> Iterator[Tuple[_Unit, str]]:
+    """Yield (unit, schnum): strictly by state priority (higher first), round-robin within a priority."""
+    for priority in sorted({priorities.get(u.progress.state_code, 0) for u in units}, reverse=True):
+        ready = deque(u for u in units if u.pending and priorities.get(u.progress.state_code, 0) == priority)
+        while ready:
+            unit = ready.popleft()
+            yield unit, unit.pending.popleft()
+            if unit.pending:
+                ready.append(unit)
+
+
+class NationwideScheduler:
+    def __init__(self, run: NationwideRun, request: NationwideAlbumRequest, session_maker: async_sessionmaker):
+        self.run = run
+        self.request = request
+        self.session_maker = session_maker
+        self.workers = settings.album_workers or os.cpu_count() or 1
+        self._db_slots = asyncio.Semaphore(settings.album_db_concurrency)
+        self._queue_depth = QUEUE_DEPTH.labels("nationwide_schools")
+
+    async def _state_names(self) -> Dict[str, str]:
+        async with self._db_slots, self.session_maker() as session:
+            result = await session.execute(select(State.code, State.state).order_by(State.code))
+            names = dict(result.tuples().all())
+        if self.request.states == "all":
+            return names
+        return {code: names.get(code, code) for code in self.request.states}
+
+    async def _plan(self) -> List[_Unit]:
+        state_names = await self._state_names()
+        batches = self.request.batches or [None]
+        units = []
+        for state_code, state_name in state_names.items():
+            for batch in batches:
+                async with self._db_slots, self.session_maker() as session:
+                    schnums = await StudentRepository(session).list_album_schnums(state_code, batch)
+                if not schnums:
+                    logger.info("No students for state %s, batch %s; skipping", state_code, batch or "ALL")
+                    continue
+
+                subdir = album_subdir(state_name, batch, per_batch=len(batches) > 1)
+                directory = Path(self.request.save_path) / subdir
+                directory.mkdir(parents=True, exist_ok=True)
+                removed = remove_partials(directory)
+                if removed:
+                    logger.info("Removed %d stale partial files in %s", removed, directory)
+
+                journal = RunJournal(directory, batch or "all", {
+                    "state_code": state_code, "batch": batch, "exam_title": self.request.exam_title,
+                })
+                finished = journal.open(self.request.resume)
+                progress = StateProgress(
+                    state_code=state_code, state_name=state_name, batch=batch,
+                    output_directory=str(directory).replace("\\", "/"),
+                    total=len(schnums), skipped=len(finished),
+                )
+                key = f"{state_code}:{batch}" if batch else state_code
+                self.run.states[key] = progress
+                units.append(_Unit(progress, journal, directory, deque(s for s in schnums if s not in finished)))
+        return units
+
+    async def _render(self, pool: Executor, unit: _Unit, schnum: str) -> None:
+        progress = unit.progress
+        try:
+            async with self._db_slots, self.session_maker() as session:
+                students, schools = await StudentRepository(session).find_album_candidates(
+                    progress.state_code, progress.batch, schnum=schnum
+                )
+            output_path = str(unit.directory / f"{schnum}.pdf")
+            await asyncio.get_running_loop().run_in_executor(
+                pool, render_school, schools.get(schnum), students, self.request.exam_title,
+                output_path, f"album_{progress.state_code}_{schnum}",
+            )
+            unit.journal.record(schnum, output_path)
+            progress.generated += 1
+            self.run.students_rendered += len(students)
+        except Exception as e:
+            logger.exception("Error generating PDF for school %s (state %s)", schnum, progress.state_code)
+            progress.failed += 1
+            progress.failed_schools.append({"schnum": schnum, "error": str(e)})
+        finally:
+            self._queue_depth.dec()
+
+    async def execute(self) -> None:
+        units = await self._plan()
+        pending = sum(len(u.pending) for u in units)
+        logger.info("Nationwide run %s: %d schools to render in %d state/batch units on %d workers",
+                    self.run.run_id, pending, len(units), self.workers)
+        self._queue_depth.inc(pending)
+
+        in_flight = asyncio.Semaphore(self.workers * PREFETCH_PER_WORKER)
+        tasks = set()
+
+        def on_done(task: asyncio.Task) -> None:
+            tasks.discard(task)
+            in_flight.release()
+
+        pool = render_pool(self.workers)
+        try:
+            for unit, schnum in interleave(units, self.request.priorities):
+                await in_flight.acquire()
+                task = asyncio.create_task(self._render(pool, unit, schnum))
+                tasks.add(task)
+                task.add_done_callback(on_done)
+            await asyncio.gather(*tasks)
+        finally:
+            remaining = list(tasks)
+            for task in remaining:
+                task.cancel()
+            await asyncio.gather(*remaining, return_exceptions=True)
+            # Schools never dispatched (e.g. the run failed) must not stay counted as queued
+            self._queue_depth.dec(sum(len(u.pending) for u in units))
+            # Shutdown waits for the render processes to exit, so it runs off the event loop
+            await asyncio.to_thread(pool.shutdown, wait=True, cancel_futures=True)
+
+
+async def run_nationwide(run: NationwideRun, request: NationwideAlbumRequest, session_maker: async_sessionmaker) -> None:
+    """Background task body: runs the whole job and records the outcome on `run`."""
+    async with async_job_log(f"nationwide_{run.run_id}"):
+        run.status = "running"
+        run.started_at = time.time()
+        try:
+            await NationwideScheduler(run, request, session_maker).execute()
+            run.status = "finished"
+        except Exception as e:
+            logger.exception("Nationwide run %s failed", run.run_id)
+            run.status = "failed"
+            run.error = str(e)
+        finally:
+            run.finished_at = time.time()
+        logger.info("Nationwide run %s %s: %s", run.run_id, run.status,
+                    {k: v for k, v in run.snapshot().items() if k != "states"})
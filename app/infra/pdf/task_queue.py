@@ -0,0 +1,51 @@
+"""
+Enqueueing side of the album_tasks work queue; `python -m app.worker` is the consuming side.
+"""
+import uuid
+from itertools import chain, zip_longest
+from typing import List, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.infra.pdf.render_pool import album_subdir
+from app.infra.repositories.sqlalchemy_repositories import AlbumTaskRepository, StateRepository, StudentRepository
+from app.schemas.album_schema import AlbumQueueRequest
+
+
+async def enqueue_albums(session: AsyncSession, request: AlbumQueueRequest) -> Tuple[str, int]:
+    """Plan one task per school for the requested states/batches; returns (run_id, tasks enqueued)."""
+    run_id = uuid.uuid4().hex[:12]
+    state_names = {state.code: state.state for state in await StateRepository(session).find_all()}
+    codes = sorted(state_names) if request.states == "all" else request.states
+    batches = request.batches or [None]
+    students = StudentRepository(session)
+
+    per_state: List[List[dict]] = []
+    for code in codes:
+        state_name = state_names.get(code, code)
+        for batch in batches:
+            subdir = album_subdir(state_name, batch, per_batch=len(batches) > 1)
+            per_state.append([
+                {
+                    "run_id": run_id, "state_code": code, "batch": batch, "schnum": schnum,
+                    "exam_title": request.exam_title, "priority": request.priorities.get(code, 0),
+                    "output_path": (subdir / f"{schnum}.pdf").as_posix(),
+                }
+                for schnum in await students.list_album_schnums(code, batch)
+            ])
+
+    # Workers claim by (priority, id), so inserting round-robin across states interleaves them fairly
+    tasks = [task for task in chain.from_iterable(zip_longest(*per_state)) if task is not None]
+    return run_id, await AlbumTaskRepository(session).enqueue(tasks)
+
+
+async def queue_status(session: AsyncSession, run_id: str) -> dict:
+    states = {}
+    totals = {"pending": 0, "running": 0, "done": 0, "failed": 0}
+    for state_code, status, count in await AlbumTaskRepository(session).run_summary(run_id):
+        states.setdefault(state_code, dict.fromkeys(totals, 0))[status] = count
+        totals[status] = totals.get(status, 0) + count
+    return {
+        "run_id": run_id,
+        "total": sum(totals.values()),
+        **totals,
+        "states": [{"state_code": code, **counts} for code, counts in states.items()],
+    }
@@ -0,0 +1,107 @@
+"""
+Line breaking for short labels (candidate names) drawn with canvas.drawString.
+
+Words are measured once with a cached stringWidth and broken greedily the same way a left-aligned
+Paragraph does, so a name that fits comes out on the same lines and baselines. A name that needs
+more lines than the box holds is set smaller, down to MIN_FONT_SIZE, and cut with "..." only if
+it still does not fit there.
+"""
+from functools import lru_cache
+from typing import List, NamedTuple, Tuple
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+
+MIN_FONT_SIZE = 6
+SHRINK_STEP = 0.5
+ELLIPSIS = "..."
+# Like Paragraph (rl_config.spaceShrinkage): a line may close up each space by this fraction to fit
+SPACE_SHRINKAGE = 0.05
+
+
+@lru_cache(maxsize=65536)
+def text_width(text: str, font_name: str, font_size: float) -> float:
+    return stringWidth(text, font_name, font_size)
+
+
+class FittedText(NamedTuple):
+    lines: Tuple[str, ...]
+    font_size: float
+    leading: float
+    width: float
+
+    @property
+    def height(self) -> float:
+        return len(self.lines) * self.leading
+
+
+def _split_long_word(word: str, font_name: str, font_size: float, max_width: float) -> List[str]:
+    """Break a word wider than max_width into pieces that each fit (at least one character per piece)."""
+    pieces, start = [], 0
+    for end in range(1, len(word) + 1):
+        if end - start > 1 and text_width(word[start:end], font_name, font_size) > max_width:
+            pieces.append(word[start:end - 1])
+            start = end - 1
+    pieces.append(word[start:])
+    return pieces
+
+
+def wrap_words(text: str, font_name: str, font_size: float, max_width: float) -> List[str]:
+    """Greedy line breaking on whitespace; words wider than max_width are split across lines."""
+    space = text_width(" ", font_name, font_size)
+    lines: List[str] = []
+    current: List[str] = []
+    current_width = 0.0
+    for word in text.split():
+        width = text_width(word, font_name, font_size)
+        if current and current_width + space + width <= max_width + SPACE_SHRINKAGE * space * len(current):
+            current.append(word)
+            current_width += space + width
+            continue
+        if current:
+            lines.append(" ".join(current))
+        if width > max_width:
+            *whole, word = _split_long_word(word, font_name, font_size, max_width)
+            lines.extend(whole)
+            width = text_width(word, font_name, font_size)
+        current, current_width = [word], width
+    if current:
+        lines.append(" ".join(current))
+    return lines
+
+
+def _truncate(line: str, font_name: str, font_size: float, max_width: float) -> str:
+    while line and text_width(line + ELLIPSIS, font_name, font_size) > max_width:
+        line = line[:-1].rstrip()
+    return line + ELLIPSIS
+
+
+def fit_text(text: str, font_name: str, font_size: float, leading: float,
+             max_width: float, max_height: float) -> FittedText:
+    """
+    Lines for `text` in a max_width x max_height box (each line takes `leading`). The size only
+    drops below font_size when the text needs more lines than fit; leading shrinks with it.
+    """
+    size = font_size
+    while True:
+        line_leading = leading * size / font_size
+        max_lines = max(1, int(max_height / line_leading + 1e-9))
+        words_fit = all(text_width(word, font_name, size) <= max_width for word in text.split())
+        lines = wrap_words(text, font_name, size, max_width)
+        if (words_fit and len(lines) <= max_lines) or size - SHRINK_STEP < MIN_FONT_SIZE:
+            break
+        size -= SHRINK_STEP
+    if len(lines) > max_lines:
+        lines = lines[:max_lines - 1] + [_truncate(lines[max_lines - 1], font_name, size, max_width)]
+    return FittedText(tuple(lines), size, line_leading, max_width)
+
+
+def draw_fitted(c: canvas.Canvas, fitted: FittedText, font_name: str, x: float, top: float) -> None:
+    """Draw left-aligned lines with the first baseline one font size below `top`, as Paragraph.drawOn does."""
+    c.setFont(font_name, fitted.font_size)
+    baseline = top - fitted.font_size
+    for line in fitted.lines:
+        # Lines that only fit by closing up their spaces are drawn with the spaces closed up
+        overflow = text_width(line, font_name, fitted.font_size) - fitted.width
+        spaces = line.count(" ")
+        c.drawString(x, baseline, line, wordSpace=-overflow / spaces if overflow > 0 and spaces else None)
+        baseline -= fitted.leading
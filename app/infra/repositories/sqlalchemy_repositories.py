@@ -1,17 +1,98 @@
-from typing import Optional, List, Tuple
+import hashlib
+import json
+import re
+from datetime import timedelta
+from itertools import groupby
+from operator import itemgetter
+from typing import Optional, List, Tuple, AsyncIterator, Sequence, Set, Dict
 from uuid import UUID
-from sqlalchemy import select, delete, update, func, insert
+from sqlalchemy import (
+    select, delete, update, func, distinct, case, insert, tuple_, any_, bindparam, String, values, column, exists, text
+)
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
-from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert, ARRAY
+from app.core.cache import replica_may_be_stale, versioned_key, cache_backend, cache_stats
+from app.core.config import settings
 from app.domain.models.student import Student
 from app.domain.models.school import School
 from app.domain.models.state import State
+from app.domain.models.album import AlbumCandidate, AlbumSchool
+from app.domain.models.album_task import AlbumTask
 from app.domain.repositories.interfaces import (
-    IStudentRepository, ISchoolRepository, IStateRepository, StudentFilter
+    IStudentRepository, ISchoolRepository, IStateRepository, IAlbumTaskRepository, StudentFilter
 )
 
 
+def batch_partition_name(batch: str) -> str:
+    """Name of the `students` partition holding one batch; safe to use as an unquoted identifier."""
+    slug = re.sub(r'[^a-z0-9]+', '_', batch.lower()).strip('_')[:36]
+    if slug != batch.lower():
+        slug = f"{slug}_{hashlib.md5(batch.encode('utf-8')).hexdigest()[:8]}"
+    return f"students_b_{slug}"
+
+
+def _sql_literal(value: str) -> str:
+    # DDL such as FOR VALUES IN (...) cannot take bind parameters
+    return "'" + value.replace("'", "''") + "'"
+
+
+async def _bulk_insert(session: AsyncSession, model, rows: List[dict],
+                       conflict_columns: Sequence[str]) -> Set[UUID]:
+    """Multi-row INSERT; rows clashing on `conflict_columns` are skipped. Returns the inserted ids."""
+    if not rows:
+        return set()
+    stmt = (
+        pg_insert(model.__table__).values(rows)
+        .on_conflict_do_nothing(index_elements=list(conflict_columns))
+        .returning(model.__table__.c.id)
+    )
+    result = await session.execute(stmt)
+    return {row[0] for row in result}
+
+
+async def _bulk_update(session: AsyncSession, model, rows: List[dict]) -> Set[UUID]:
+    """
+    UPDATE ... FROM (VALUES ...) keyed on id, one statement per distinct set of changed columns.
+    Each row is {"id": ..., <column>: <value>, ...}. Returns the ids that matched a row.
+    """
+    table = model.__table__
+    groups: dict = {}
+    for row in rows:
+        groups.setdefault(tuple(sorted(k for k in row if k != "id")), []).append(row)
+    
+    updated = set()
+    for columns, group in groups.items():
+        if not columns:
+            continue
+        data = values(
+            *(column(name, table.c[name].type) for name in ("id",) + columns), name="data"
+        ).data([tuple(row[name] for name in ("id",) + columns) for row in group])
+        stmt = (
+            update(table)
+            .where(table.c.id == data.c.id)
+            .values({name: data.c[name] for name in columns})
+            .returning(table.c.id)
+        )
+        result = await session.execute(stmt)
+        updated.update(row[0] for row in result)
+    return updated
+
+
+async def _bulk_delete(session: AsyncSession, model, ids: List[UUID], *where) -> Set[UUID]:
+    if not ids:
+        return set()
+    table = model.__table__
+    stmt = (
+        delete(table)
+        .where(table.c.id == any_(bindparam("ids", list(ids), type_=ARRAY(table.c.id.type))), *where)
+        .returning(table.c.id)
+    )
+    result = await session.execute(stmt)
+    return {row[0] for row in result}
+
+
 class StudentRepository(IStudentRepository):
     def __init__(self, session: AsyncSession):
         self.session = session
@@ -26,14 +107,35 @@ class StudentRepository(IStudentRepository):
         await self.session.flush()
         return len(students)
     
+    async def bulk_insert(self, rows: List[dict]) -> Set[UUID]:
+        """Insert column dicts in one statement; rows whose reg_no already exists in the batch are skipped."""
+        inserted = await _bulk_insert(self.session, Student, rows, ("reg_no", "batch"))
+        return inserted
+    
+    async def bulk_update(self, rows: List[dict]) -> Set[UUID]:
+        updated = await _bulk_update(self.session, Student, rows)
+        return updated
+    
+    async def bulk_delete(self, ids: List[UUID]) -> Tuple[Set[UUID], Set[UUID]]:
+        """Returns (deleted ids, ids that could not be deleted); students are never blocked."""
+        deleted = await _bulk_delete(self.session, Student, ids)
+        return deleted, set()
+    
     async def get_by_id(self, id: UUID) -> Optional[Student]:
         result = await self.session.execute(
             select(Student).options(selectinload(Student.school)).where(Student.id == id)
         )
         return result.scalar_one_or_none()
     
-    async def find(self, filters: StudentFilter, limit: int, offset: int) -> Tuple[int, List[Student]]:
-        query = select(Student).join(School, Student.school_id == School.id, isouter=True)
+    # Columns needed to build a StudentRead without loading ORM objects
+    READ_COLUMNS = (
+        Student.id, Student.batch, Student.schnum, Student.sch_name, Student.reg_no, Student.ser_no,
+        Student.cand_name, Student.school_id, Student.photo_path, Student.created_at, Student.updated_at,
+        School.sch_name.label("school_name"), School.state_name,
+    )
+    
+    def _filtered_query(self, filters: StudentFilter, columns: Sequence = (Student,)):
+        query = select(*columns).join(School, Student.school_id == School.id, isouter=True)
         
         if filters.schnum:
             query = query.where(Student.schnum == filters.schnum)
@@ -47,18 +149,355 @@ class StudentRepository(IStudentRepository):
             query = query.where(Student.cand_name.ilike(f"%{filters.cand_name}%"))
         if filters.reg_no:
             query = query.where(Student.reg_no.ilike(f"%{filters.reg_no}%"))
+        return query
+    
+    async def find(self, filters: StudentFilter, limit: int, offset: int) -> Tuple[int, List[Student]]:
+        total, _ = await self.count(filters)
+        students = await self.find_page(filters, limit, offset)
+        return total, students
+    
+    async def find_page(self, filters: StudentFilter, limit: int, offset: int = 0,
+                        after: Optional[Tuple[str, str, UUID]] = None) -> List[Student]:
+        """Page ordered by (schnum, ser_no, id); pass `after` for keyset paging instead of an offset."""
+        query = self._filtered_query(filters)
+        if after is not None:
+            query = query.where(tuple_(Student.schnum, Student.ser_no, Student.id) > tuple_(*after))
         
-        count_query = select(func.count()).select_from(query.subquery())
-        total = await self.session.scalar(count_query)
+        query = (
+            query.options(selectinload(Student.school))
+            .order_by(Student.schnum, Student.ser_no, Student.id)
+            .limit(limit)
+        )
+        if offset:
+            query = query.offset(offset)
+        result = await self.session.execute(query)
+        return result.scalars().all()
+    
+    async def find_rows(self, filters: StudentFilter, limit: int, offset: int = 0,
+                        after: Optional[Tuple[str, str, UUID]] = None) -> List[Row]:
+        """Same page as find_page, projected to READ_COLUMNS tuples instead of ORM objects."""
+        query = self._filtered_query(filters, self.READ_COLUMNS)
+        if after is not None:
+            query = query.where(tuple_(Student.schnum, Student.ser_no, Student.id) > tuple_(*after))
         
-        query = query.options(selectinload(Student.school)).limit(limit).offset(offset)
+        query = query.order_by(Student.schnum, Student.ser_no, Student.id).limit(limit)
+        if offset:
+            query = query.offset(offset)
         result = await self.session.execute(query)
-        return total or 0, result.scalars().all()
+        return result.all()
+    
+    async def count(self, filters: StudentFilter, estimate: bool = False) -> Tuple[int, bool]:
+        """
+        Total rows matching the filters, as (total, is_estimate).
+        Exact totals are cached per normalized filter until the next student/school write
+        (see app.core.cache.invalidate).
+        With estimate=True the planner's row estimate is used when it is large enough to be
+        meaningful; small result sets are still counted exactly.
+        """
+        key = await versioned_key("students", "count", filters.cache_key())
+        cacheable = not await replica_may_be_stale("students")
+        cached = await cache_backend.get(key)
+        if cached is not None:
+            cache_stats["count"]["hits"] += 1
+            return int(cached), False
+        cache_stats["count"]["misses"] += 1
+        
+        query = self._filtered_query(filters)
+        if estimate:
+            estimated = await self._planner_estimate(query)
+            if estimated >= settings.count_estimate_min_rows:
+                return estimated, True
+        
+        total = await self.session.scalar(select(func.count()).select_from(query.subquery())) or 0
+        if cacheable:
+            await cache_backend.set(key, str(total).encode("ascii"))
+        return total, False
+    
+    async def _planner_estimate(self, query) -> int:
+        connection = await self.session.connection()
+        compiled = query.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True})
+        # exec_driver_sql so literal filter values are never parsed as bind parameters
+        result = await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}")
+        plan = result.scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    
+    def _by_state_query(self, state_code: str, batch: Optional[str] = None):
+        query = (
+            select(
+                Student.reg_no, Student.cand_name, Student.ser_no, School.sch_name,
+                Student.schnum, School.town, School.custodian, Student.photo_path, Student.batch
+            )
+            .join(School, Student.school_id == School.id)
+            .where(School.state == state_code)
+        )
+        if batch:
+            query = query.where(Student.batch == batch)
+        return query
+    
+    async def find_by_state(self, state_code: str, batch: Optional[str] = None) -> List[Row]:
+        result = await self.session.execute(self._by_state_query(state_code, batch))
+        return result.all()
+    
+    async def stream_by_state(self, state_code: str, batch: Optional[str] = None,
+                              chunk_size: int = 1000) -> AsyncIterator[Sequence[Row]]:
+        """
+        Yield (Student, School) column rows for a state in chunks, fetched through a
+        server-side cursor so memory stays flat however large the state is.
+        """
+        query = self._by_state_query(state_code, batch)
+        result = await self.session.stream(query.execution_options(yield_per=chunk_size))
+        async for rows in result.partitions():
+            yield rows
+    
+    async def find_by_reg_nos(self, reg_nos: Sequence[str], batch: Optional[str] = None) -> List[Row]:
+        """
+        Exact reg_no matches with school details, resolved in one statement through the unique
+        (reg_no, batch) index (= ANY of a single array parameter, so no per-value bind limit).
+        reg_no is only unique within a batch: without `batch`, a reg_no matches one row per batch
+        it appears in, ordered by (reg_no, batch).
+        """
+        query = (
+            select(
+                Student.reg_no, Student.cand_name, Student.ser_no, Student.batch, Student.schnum,
+                School.sch_name, School.state, School.town, School.custodian, Student.photo_path
+            )
+            .join(School, Student.school_id == School.id, isouter=True)
+            .where(Student.reg_no == any_(bindparam("reg_nos", list(reg_nos), type_=ARRAY(String))))
+            .order_by(Student.reg_no, Student.batch)
+        )
+        if batch:
+            query = query.where(Student.batch == batch)
+        result = await self.session.execute(query)
+        return result.all()
+    
+    ALBUM_CANDIDATE_COLUMNS = (
+        Student.reg_no, Student.ser_no, Student.cand_name, Student.photo_path, Student.schnum, Student.batch,
+    )
+    ALBUM_SCHOOL_COLUMNS = (
+        School.schnum, School.sch_name, School.town, School.custodian, School.state, School.state_name,
+    )
+    
+    def _album_query(self, state_code: Optional[str] = None, batch: Optional[str] = None,
+                     school_id: Optional[UUID] = None, schnum: Optional[str] = None):
+        # Schools are matched on schnum, as generate-to-disk always did: students imported before their
+        # school have no school_id, and nothing backfills it. school_id is only used as an explicit filter.
+        query = (
+            select(*self.ALBUM_CANDIDATE_COLUMNS, *self.ALBUM_SCHOOL_COLUMNS)
+            .join(School, School.schnum == Student.schnum, isouter=True)
+            .order_by(Student.schnum, Student.ser_no)
+        )
+        if state_code:
+            query = query.where(School.state == state_code)
+        if batch:
+            query = query.where(Student.batch == batch)
+        if school_id:
+            query = query.where(Student.school_id == school_id)
+        if schnum:
+            query = query.where(Student.schnum == schnum)
+        return query
+    
+    async def find_album_candidates(self, state_code: Optional[str] = None, batch: Optional[str] = None,
+                                    school_id: Optional[UUID] = None, schnum: Optional[str] = None
+                                    ) -> Tuple[List[AlbumCandidate], Dict[str, AlbumSchool]]:
+        """
+        Column-projected album data in (schnum, ser_no) order: one AlbumCandidate per student and
+        one AlbumSchool per schnum, without loading ORM objects.
+        """
+        result = await self.session.execute(self._album_query(state_code, batch, school_id, schnum))
+        split = len(self.ALBUM_CANDIDATE_COLUMNS)
+        candidates: List[AlbumCandidate] = []
+        schools: Dict[str, AlbumSchool] = {}
+        for row in result.tuples():
+            candidates.append(AlbumCandidate._make(row[:split]))
+            if row[split] is not None and row[split] not in schools:
+                schools[row[split]] = AlbumSchool._make(row[split:])
+        return candidates, schools
+    
+    async def list_album_schnums(self, state_code: Optional[str] = None, batch: Optional[str] = None) -> List[str]:
+        """The schnums that have album candidates, in schnum order."""
+        query = (
+            self._album_query(state_code, batch)
+            .with_only_columns(Student.schnum).distinct()
+            .order_by(None).order_by(Student.schnum)
+        )
+        return list((await self.session.execute(query)).scalars().all())
+    
+    async def count_album_schools(self, state_code: Optional[str] = None, batch: Optional[str] = None) -> int:
+        query = self._album_query(state_code, batch).order_by(None).with_only_columns(
+            func.count(distinct(Student.schnum))
+        )
+        return (await self.session.execute(query)).scalar_one()
+    
+    async def stream_album_groups(self, state_code: Optional[str] = None, batch: Optional[str] = None,
+                                  chunk_size: int = 2000
+                                  ) -> AsyncIterator[Tuple[str, Optional[AlbumSchool], List[AlbumCandidate]]]:
+        """
+        Yield (schnum, school, candidates) one school at a time, in schnum order, from a server-side
+        cursor: rendering can start on the first school and memory is bounded by the largest school.
+        """
+        split = len(self.ALBUM_CANDIDATE_COLUMNS)
+        by_schnum = itemgetter(AlbumCandidate._fields.index("schnum"))
+        query = self._album_query(state_code, batch)
+        result = await self.session.stream(query.execution_options(yield_per=chunk_size))
+        schnum, school, candidates = None, None, []
+        async for rows in result.partitions():
+            # Rows arrive ordered by schnum, so a group ends where the schnum changes
+            for row_schnum, group in groupby(rows, key=by_schnum):
+                if row_schnum != schnum:
+                    if candidates:
+                        yield schnum, school, candidates
+                    schnum, school, candidates = row_schnum, None, []
+                for row in group:
+                    if school is None and row[split] is not None:
+                        school = AlbumSchool._make(row[split:])
+                    candidates.append(AlbumCandidate._make(row[:split]))
+        if candidates:
+            yield schnum, school, candidates
+    
+    # Columns available to roster exports, by output name
+    EXPORT_COLUMNS = {
+        "reg_no": Student.reg_no,
+        "ser_no": Student.ser_no,
+        "cand_name": Student.cand_name,
+        "batch": Student.batch,
+        "schnum": Student.schnum,
+        "sch_name": School.sch_name,
+        "state": School.state,
+        "state_name": School.state_name,
+        "town": School.town,
+        "custodian": School.custodian,
+        "photo_path": Student.photo_path,
+        "has_photo": Student.photo_path.isnot(None),
+    }
+    
+    async def stream_export(self, fields: Sequence[str], state: Optional[str] = None,
+                            batch: Optional[str] = None, schnum: Optional[str] = None,
+                            chunk_size: int = 10000) -> AsyncIterator[Sequence[Row]]:
+        """Yield export rows (EXPORT_COLUMNS by name) ordered by (schnum, ser_no) in fixed-size chunks."""
+        query = (
+            select(*(self.EXPORT_COLUMNS[name].label(name) for name in fields))
+            .select_from(Student)
+            .join(School, Student.school_id == School.id, isouter=True)
+        )
+        if state:
+            query = query.where(School.state == state)
+        if batch:
+            query = query.where(Student.batch == batch)
+        if schnum:
+            query = query.where(Student.schnum == schnum)
+        query = query.order_by(Student.schnum, Student.ser_no)
+        
+        result = await self.session.stream(query.execution_options(yield_per=chunk_size))
+        async for rows in result.partitions():
+            yield rows
     
     async def delete_all(self) -> int:
-        result = await self.session.execute(delete(Student))
+        """
+        Full wipe via TRUNCATE: no per-row WAL, and the table's storage is released immediately.
+        The lock TRUNCATE needs is taken first, so no rows can be added between the count and the wipe.
+        """
+        await self.session.execute(text("LOCK TABLE students IN ACCESS EXCLUSIVE MODE"))
+        count = await self.session.scalar(select(func.count()).select_from(Student))
+        await self.session.execute(text("TRUNCATE TABLE students"))
+        return count or 0
+    
+    async def delete_scoped(self, state: Optional[str] = None, batch: Optional[str] = None,
+                            schnum: Optional[str] = None) -> int:
+        """Set-based delete of the students in a state, batch and/or school (at least one is required)."""
+        if not (state or batch or schnum):
+            raise ValueError("At least one of state, batch or schnum is required")
+        
+        if batch and not (state or schnum):
+            partition = await self._batch_partition(batch)
+            if partition:
+                # The whole batch is one partition: truncate it instead of deleting row by row
+                await self.session.execute(text(f"LOCK TABLE {partition} IN ACCESS EXCLUSIVE MODE"))
+                count = await self.session.scalar(select(func.count()).select_from(text(partition)))
+                await self.session.execute(text(f"TRUNCATE TABLE {partition}"))
+                return count or 0
+        
+        stmt = delete(Student)
+        if state:
+            stmt = stmt.where(Student.school_id.in_(select(School.id).where(School.state == state)))
+        if batch:
+            stmt = stmt.where(Student.batch == batch)
+        if schnum:
+            stmt = stmt.where(Student.schnum == schnum)
+        result = await self.session.execute(stmt)
         return result.rowcount
     
+    async def analyze(self) -> None:
+        """Refresh planner statistics (used by count=estimate) after large deletes or loads."""
+        await self.session.execute(text("ANALYZE students"))
+    
+    async def _batch_partition(self, batch: str) -> Optional[str]:
+        """The batch's partition name if it is currently attached to `students`."""
+        name = batch_partition_name(batch)
+        attached = await self.session.scalar(
+            text(
+                "SELECT EXISTS (SELECT 1 FROM pg_inherits "
+                "WHERE inhparent = 'students'::regclass AND inhrelid = to_regclass(:name))"
+            ),
+            {"name": name}
+        )
+        return name if attached else None
+    
+    async def ensure_batch_partitions(self, batches: Set[str]) -> List[str]:
+        """
+        Create a partition for every batch that does not have one yet. Rows of that batch
+        already sitting in `students_default` are moved into the new partition.
+        Returns the names of the partitions created.
+        
+        CREATE TABLE ... PARTITION OF locks `students` exclusively, so run this in its own short
+        transaction ahead of the import rather than inside it.
+        """
+        created = []
+        for batch in sorted(batches):
+            if await self._batch_partition(batch):
+                continue
+            name = batch_partition_name(batch)
+            in_default = await self.session.scalar(
+                text("SELECT EXISTS (SELECT 1 FROM students_default WHERE batch = :batch)"),
+                {"batch": batch}
+            )
+            if in_default:
+                # Postgres refuses to create a partition whose rows are still in the default one.
+                # Park them in a temp table instead of detaching and re-attaching the default
+                # partition, which would revalidate every row in it.
+                await self.session.execute(
+                    text("CREATE TEMP TABLE students_moving AS SELECT * FROM students_default WHERE batch = :batch"),
+                    {"batch": batch}
+                )
+                await self.session.execute(
+                    text("DELETE FROM students_default WHERE batch = :batch"), {"batch": batch}
+                )
+            await self.session.execute(text(
+                f"CREATE TABLE {name} PARTITION OF students FOR VALUES IN ({_sql_literal(batch)})"
+            ))
+            if in_default:
+                await self.session.execute(text("INSERT INTO students SELECT * FROM students_moving"))
+                await self.session.execute(text("DROP TABLE students_moving"))
+            created.append(name)
+        return created
+    
+    async def archive_batch(self, batch: str) -> Optional[str]:
+        """
+        Detach a batch's partition from `students` and keep it as a standalone archive table.
+        A metadata-only change: no rows are copied or deleted. Returns the archive table name,
+        or None if the batch has no partition.
+        """
+        partition = await self._batch_partition(batch)
+        if not partition:
+            return None
+        archive = partition.replace("students_b_", "students_archive_", 1)
+        if await self.session.scalar(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": archive}):
+            raise ValueError(f"Archive table {archive} already exists")
+        await self.session.execute(text(f"ALTER TABLE students DETACH PARTITION {partition}"))
+        await self.session.execute(text(f"ALTER TABLE {partition} RENAME TO {archive}"))
+        return archive
+    
     async def update(self, student: Student) -> Student:
         await self.session.flush()
         return student
@@ -122,6 +561,29 @@ class SchoolRepository(ISchoolRepository):
         
         return total_inserted
     
+    async def bulk_insert(self, rows: List[dict]) -> Set[UUID]:
+        """Insert column dicts in one statement; rows whose schnum already exists are skipped."""
+        inserted = await _bulk_insert(self.session, School, rows, ("schnum",))
+        return inserted
+    
+    async def bulk_update(self, rows: List[dict]) -> Set[UUID]:
+        updated = await _bulk_update(self.session, School, rows)
+        return updated
+    
+    async def bulk_delete(self, ids: List[UUID]) -> Tuple[Set[UUID], Set[UUID]]:
+        """Returns (deleted ids, ids still referenced by students and therefore kept)."""
+        deleted = await _bulk_delete(
+            self.session, School, ids, ~exists().where(Student.school_id == School.id)
+        )
+        remaining = [i for i in ids if i not in deleted]
+        in_use = set()
+        if remaining:
+            result = await self.session.execute(
+                select(School.id).where(School.id == any_(bindparam("ids", remaining, type_=ARRAY(School.id.type))))
+            )
+            in_use = {row[0] for row in result}
+        return deleted, in_use
+    
     async def get_by_id(self, id: UUID) -> Optional[School]:
         result = await self.session.execute(select(School).where(School.id == id))
         return result.scalar_one_or_none()
@@ -131,8 +593,16 @@ class SchoolRepository(ISchoolRepository):
         return result.scalar_one_or_none()
     
     async def find_all(self, schnum: Optional[str] = None, state: Optional[str] = None,
-                      sch_name: Optional[str] = None) -> List[School]:
-        query = select(School)
+                      sch_name: Optional[str] = None, fields: Optional[Sequence[str]] = None,
+                      limit: Optional[int] = None, after: Optional[str] = None) -> List[School]:
+        """
+        Matching schools; with `fields`, only those columns are selected and Row tuples are returned.
+        `limit`/`after` page through results in schnum order, starting after the given schnum.
+        """
+        if fields:
+            query = select(*(School.__table__.c[name] for name in fields))
+        else:
+            query = select(School)
         
         if schnum:
             query = query.where(School.schnum == schnum)
@@ -140,13 +610,26 @@ class SchoolRepository(ISchoolRepository):
             query = query.where(School.state == state)
         if sch_name:
             query = query.where(School.sch_name.ilike(f"%{sch_name}%"))
+        if after is not None:
+            query = query.where(School.schnum > after)
+        if limit is not None or after is not None:
+            query = query.order_by(School.schnum)
+        if limit is not None:
+            query = query.limit(limit)
         
         result = await self.session.execute(query)
-        return result.scalars().all()
+        return result.all() if fields else result.scalars().all()
     
     async def delete_all(self) -> int:
-        result = await self.session.execute(delete(School))
-        return result.rowcount
+        """
+        Full wipe via TRUNCATE. Students reference schools, so they are truncated in the same
+        statement; PostgreSQL does not allow truncating schools on its own. Both are locked before
+        counting so the count matches what is wiped.
+        """
+        await self.session.execute(text("LOCK TABLE students, schools IN ACCESS EXCLUSIVE MODE"))
+        count = await self.session.scalar(select(func.count()).select_from(School))
+        await self.session.execute(text("TRUNCATE TABLE students, schools"))
+        return count or 0
     
     async def update(self, school: School) -> School:
         await self.session.flush()
@@ -199,3 +682,110 @@ class StateRepository(IStateRepository):
     async def delete_by_code(self, code: str) -> bool:
         result = await self.session.execute(delete(State).where(State.code == code))
         return result.rowcount > 0
+
+
+class AlbumTaskRepository(IAlbumTaskRepository):
+    """
+    The album_tasks work queue. Workers claim pending tasks with FOR UPDATE SKIP LOCKED, so any number
+    of them can poll at once without blocking each other, and hold each task under a lease they renew.
+    Every transition after the claim checks lease_owner, so a worker that lost its lease cannot
+    overwrite the outcome of the worker that took the task over.
+    """
+    
+    ENQUEUE_CHUNK = 2000
+    
+    def __init__(self, session: AsyncSession):
+        self.session = session
+    
+    async def enqueue(self, tasks: Sequence[dict]) -> int:
+        """Insert tasks in the given order (which is the claim order within a priority); skips duplicates."""
+        inserted = 0
+        for i in range(0, len(tasks), self.ENQUEUE_CHUNK):
+            stmt = pg_insert(AlbumTask).values(list(tasks[i:i + self.ENQUEUE_CHUNK]))
+            result = await self.session.execute(stmt.on_conflict_do_nothing(index_elements=["run_id", "output_path"]))
+            inserted += result.rowcount
+        return inserted
+    
+    def _lease_until(self, lease_seconds: int):
+        return func.now() + timedelta(seconds=lease_seconds)
+    
+    async def claim(self, worker_id: str, limit: int, lease_seconds: int) -> List[AlbumTask]:
+        claimable = (
+            select(AlbumTask.id)
+            .where(AlbumTask.status == "pending")
+            .order_by(AlbumTask.priority.desc(), AlbumTask.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        stmt = (
+            update(AlbumTask)
+            .where(AlbumTask.id.in_(claimable))
+            .values(status="running", lease_owner=worker_id, lease_expires_at=self._lease_until(lease_seconds),
+                    attempts=AlbumTask.attempts + 1)
+            .returning(AlbumTask)
+            .execution_options(synchronize_session=False)
+        )
+        tasks = (await self.session.execute(stmt)).scalars().all()
+        return sorted(tasks, key=lambda task: (-task.priority, task.id))
+    
+    async def heartbeat(self, worker_id: str, task_ids: Sequence[int], lease_seconds: int) -> Set[int]:
+        """Extend the leases; returns the ids this worker still owns."""
+        if not task_ids:
+            return set()
+        stmt = (
+            update(AlbumTask)
+            .where(AlbumTask.id.in_(task_ids), AlbumTask.lease_owner == worker_id, AlbumTask.status == "running")
+            .values(lease_expires_at=self._lease_until(lease_seconds))
+            .returning(AlbumTask.id)
+        )
+        return set((await self.session.execute(stmt)).scalars().all())
+    
+    async def complete(self, task_id: int, worker_id: str) -> bool:
+        stmt = (
+            update(AlbumTask)
+            .where(AlbumTask.id == task_id, AlbumTask.lease_owner == worker_id, AlbumTask.status == "running")
+            .values(status="done", finished_at=func.now(), lease_owner=None, lease_expires_at=None, last_error=None)
+        )
+        return (await self.session.execute(stmt)).rowcount > 0
+    
+    def _retry_or_fail(self, max_attempts: int):
+        return case((AlbumTask.attempts >= max_attempts, "failed"), else_="pending")
+    
+    async def fail(self, task_id: int, worker_id: str, error: str, max_attempts: int) -> bool:
+        """Put the task back in the queue, or mark it failed once it has used its attempts."""
+        stmt = (
+            update(AlbumTask)
+            .where(AlbumTask.id == task_id, AlbumTask.lease_owner == worker_id, AlbumTask.status == "running")
+            .values(status=self._retry_or_fail(max_attempts), last_error=error[:2000],
+                    lease_owner=None, lease_expires_at=None)
+        )
+        return (await self.session.execute(stmt)).rowcount > 0
+    
+    async def reclaim_expired(self, max_attempts: int) -> int:
+        """Return tasks whose worker stopped renewing its lease (crashed, killed, partitioned) to the queue."""
+        stmt = (
+            update(AlbumTask)
+            .where(AlbumTask.status == "running", AlbumTask.lease_expires_at < func.now())
+            .values(status=self._retry_or_fail(max_attempts),
+                    last_error="Lease expired on worker " + func.coalesce(AlbumTask.lease_owner, "?"),
+                    lease_owner=None, lease_expires_at=None)
+        )
+        return (await self.session.execute(stmt)).rowcount
+    
+    async def requeue_failed(self, run_id: str) -> int:
+        stmt = (
+            update(AlbumTask)
+            .where(AlbumTask.run_id == run_id, AlbumTask.status == "failed")
+            .values(status="pending", attempts=0)
+        )
+        return (await self.session.execute(stmt)).rowcount
+    
+    async def run_summary(self, run_id: str) -> List[Row]:
+        """(state_code, status, count) rows for one run."""
+        query = (
+            select(AlbumTask.state_code, AlbumTask.status, func.count())
+            .where(AlbumTask.run_id == run_id)
+            .group_by(AlbumTask.state_code, AlbumTask.status)
+            .order_by(AlbumTask.state_code)
+        )
+        return (await self.session.execute(query)).all()
@@ -1,9 +1,19 @@
+import time
 from pathlib import Path
-from fastapi import FastAPI
+from fastapi import FastAPI, Response, Header, HTTPException
+from fastapi.responses import FileResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from app.api.v1.routers import students, schools, states, uploads, albums
+from app.api.v1.routers import students, schools, states, uploads, albums, exports
 from app.core.config import settings
+from app.core.cache import cache_info
+from app.core.db import engine, replica_engine, pool_status
+from app.core.instrumentation import SQLInstrumentationMiddleware, instrument_engine
+from app.core.metrics import PrometheusMiddleware, metrics_response_body, METRICS_CONTENT_TYPE
+from app.core.profiling import ProfilingMiddleware, is_admin_token, profiles_dir
+from app.core.logging_config import setup_logging
+
+setup_logging()
 
 app = FastAPI(
     title="NECO Photo Album API",
@@ -18,8 +28,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Profile-Url"],
 )
 
+# Per-request statement counts and DB time, slow-query and N+1 logging
+app.add_middleware(SQLInstrumentationMiddleware)
+app.add_middleware(PrometheusMiddleware)
+# Added last, so it is outermost and a profile covers the whole request
+app.add_middleware(ProfilingMiddleware)
+instrument_engine(engine)
+if replica_engine is not None:
+    instrument_engine(replica_engine)
+
 
 # Include routers
 app.include_router(students.router, prefix="/api/v1")
@@ -27,6 +47,7 @@ app.include_router(schools.router, prefix="/api/v1")
 app.include_router(states.router, prefix="/api/v1")
 app.include_router(uploads.router, prefix="/api/v1")
 app.include_router(albums.router, prefix="/api/v1")
+app.include_router(exports.router, prefix="/api/v1")
 
 # Mount Static Files
 media_path = Path(settings.media_root)
@@ -41,4 +62,44 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(metrics_response_body(), media_type=METRICS_CONTENT_TYPE)
+
+
+@app.get("/profiles/{filename}", include_in_schema=False)
+async def download_profile(filename: str, x_profile_token: str = Header(None)):
+    if not is_admin_token(x_profile_token):
+        raise HTTPException(status_code=403, detail="Profiling token required")
+    path = profiles_dir() / Path(filename).name
+    if not path.is_file():
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, filename=path.name)
+
+
+@app.get("/health/cache")
+async def cache_health():
+    return cache_info()
+
+
+@app.get("/health/db")
+async def db_health():
+    """Connection pool usage and checkout wait times, plus a round-trip to the database."""
+    status = {"database": await _ping(engine), "pool": pool_status()}
+    if replica_engine is not None:
+        status["replica"] = await _ping(replica_engine)
+        status["replica_pool"] = pool_status(replica_engine)
+    return status
+
+
+async def _ping(target) -> dict:
+    start = time.perf_counter()
+    try:
+        async with target.connect() as connection:
+            await connection.exec_driver_sql("SELECT 1")
+        return {"status": "ok", "latency_ms": round((time.perf_counter() - start) * 1000, 3)}
+    except Exception as e:
+        return {"status": "error", "error": str(e)}
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import Dict, List, Literal, Optional, Union
 
 
 class AlbumGenerationToDiskRequest(BaseModel):
@@ -7,3 +7,17 @@ class AlbumGenerationToDiskRequest(BaseModel):
     exam_title: str
     batch: Optional[str] = None  # None means "All Batches"
     save_path: str = "C:/albums"
+    resume: bool = False  # Skip schools a previous, interrupted run with the same parameters finished
+    batch_subdir: bool = False  # Write to <save_path>/<state>/<batch>/ instead of <save_path>/<state>/
+
+
+class AlbumQueueRequest(BaseModel):
+    states: Union[Literal["all"], List[str]] = "all"
+    exam_title: str
+    batches: Optional[List[str]] = None  # None means one "All Batches" album per school
+    priorities: Dict[str, int] = Field(default_factory=dict)  # state code -> priority, higher first; default 0
+
+
+class NationwideAlbumRequest(AlbumQueueRequest):
+    save_path: str = "C:/albums"
+    resume: bool = False
@@ -0,0 +1,25 @@
+from pydantic import BaseModel, Field
+from typing import Optional, Literal, Any, Dict, List
+from uuid import UUID
+
+
+class BulkOperation(BaseModel):
+    op: Literal["create", "update", "delete"]
+    id: Optional[UUID] = None  # required for update and delete
+    data: Optional[Dict[str, Any]] = None  # create/update payload, validated per item
+
+
+class BulkRequest(BaseModel):
+    operations: List[BulkOperation] = Field(..., min_length=1, max_length=50000)
+
+
+class BulkItemResult(BaseModel):
+    index: int
+    status: Literal["created", "updated", "deleted", "not_found", "conflict", "invalid", "error"]
+    id: Optional[UUID] = None
+    error: Optional[str] = None
+
+
+class BulkResponse(BaseModel):
+    summary: Dict[str, int]
+    results: List[BulkItemResult]
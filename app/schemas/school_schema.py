@@ -1,6 +1,7 @@
 from pydantic import BaseModel
 from datetime import datetime
 from uuid import UUID
+from typing import Optional
 
 
 class SchoolBase(BaseModel):
@@ -31,3 +32,9 @@ class SchoolRead(SchoolBase):
     
     class Config:
         from_attributes = True
+
+
+class SchoolPage(BaseModel):
+    items: list
+    limit: int
+    next_cursor: Optional[str] = None
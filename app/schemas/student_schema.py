@@ -1,7 +1,7 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
 from uuid import UUID
-from typing import Optional
+from typing import Optional, List
 
 
 class StudentBase(BaseModel):
@@ -41,7 +41,20 @@ class StudentRead(StudentBase):
 
 
 class PaginatedResponse(BaseModel):
-    total: int
-    page: int
+    total: Optional[int] = None
+    total_is_estimate: bool = False
+    page: Optional[int] = None
     limit: int
     items: list
+    next_cursor: Optional[str] = None
+
+
+class StudentLookupRequest(BaseModel):
+    reg_nos: List[str] = Field(..., min_length=1, max_length=50000)
+    # reg_no is unique per batch; without one, a reg_no found in several batches is returned once per batch
+    batch: Optional[str] = None
+
+
+class StudentLookupResponse(BaseModel):
+    found: list
+    missing: List[str]
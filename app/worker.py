@@ -0,0 +1,160 @@
+"""
+Render worker for the album_tasks queue. Start one per render node (or several on one box):
+
+    python -m app.worker --processes 4
+
+It claims school tasks with FOR UPDATE SKIP LOCKED, renders them with DiskPDFGenerator on a local
+process pool and writes them under ALBUM_OUTPUT_ROOT, which every node mounts from the same shared
+storage. A heartbeat renews the leases of the tasks in hand; if a worker dies, its tasks go back to
+the queue once their leases expire (ALBUM_TASK_LEASE_SECONDS) and another worker picks them up.
+SIGINT/SIGTERM stop claiming and let the tasks in hand finish.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import socket
+from concurrent.futures import Executor
+from pathlib import Path
+from typing import Dict, Set
+from app.core.config import settings
+from app.core.db import async_session_maker, read_session_maker
+from app.core.logging_config import setup_logging
+from app.domain.models.album_task import AlbumTask
+from app.infra.pdf.render_pool import render_pool, render_school
+from app.infra.repositories.sqlalchemy_repositories import AlbumTaskRepository, StudentRepository
+
+logger = logging.getLogger("app.worker")
+
+
+class RenderWorker:
+    def __init__(self, worker_id: str, processes: int):
+        self.worker_id = worker_id
+        self.processes = processes
+        self.lease_seconds = settings.album_task_lease_seconds
+        self.max_attempts = settings.album_task_max_attempts
+        self._in_hand: Dict[int, AlbumTask] = {}
+        self._stopping = asyncio.Event()
+
+    def stop(self) -> None:
+        if not self._stopping.is_set():
+            logger.info("Worker %s stopping after %d task(s) in hand", self.worker_id, len(self._in_hand))
+            self._stopping.set()
+
+    async def _claim(self, limit: int):
+        async with async_session_maker() as session, session.begin():
+            repo = AlbumTaskRepository(session)
+            reclaimed = await repo.reclaim_expired(self.max_attempts)
+            if reclaimed:
+                logger.warning("Reclaimed %d task(s) with expired leases", reclaimed)
+            return await repo.claim(self.worker_id, limit, self.lease_seconds)
+
+    async def _heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            if not self._in_hand:
+                continue
+            try:
+                async with async_session_maker() as session, session.begin():
+                    owned = await AlbumTaskRepository(session).heartbeat(
+                        self.worker_id, list(self._in_hand), self.lease_seconds
+                    )
+            except Exception:
+                # Keep rendering: the lease only lapses if heartbeats keep failing for a whole lease period
+                logger.exception("Heartbeat failed")
+                continue
+            for task_id in set(self._in_hand) - owned:
+                logger.warning("Lost the lease on task %d (school %s); another worker may redo it",
+                               task_id, self._in_hand[task_id].schnum)
+
+    async def _process(self, pool: Executor, task: AlbumTask) -> None:
+        try:
+            async with read_session_maker() as session:
+                students, schools = await StudentRepository(session).find_album_candidates(
+                    task.state_code, task.batch, schnum=task.schnum
+                )
+            if not students:
+                raise ValueError(f"No students found for school {task.schnum}")
+            output_file = Path(settings.album_output_root) / task.output_path
+            output_file.parent.mkdir(parents=True, exist_ok=True)
+            await asyncio.get_running_loop().run_in_executor(
+                pool, render_school, schools.get(task.schnum), students, task.exam_title,
+                str(output_file), f"album_{task.state_code}_{task.schnum}",
+            )
+            async with async_session_maker() as session, session.begin():
+                completed = await AlbumTaskRepository(session).complete(task.id, self.worker_id)
+            if completed:
+                logger.debug("Task %d done: %s", task.id, output_file)
+            else:
+                logger.warning("Task %d finished after its lease was lost; result left to the new owner", task.id)
+        except Exception as e:
+            logger.exception("Task %d (school %s) failed on attempt %d", task.id, task.schnum, task.attempts)
+            try:
+                async with async_session_maker() as session, session.begin():
+                    await AlbumTaskRepository(session).fail(task.id, self.worker_id, str(e), self.max_attempts)
+            except Exception:
+                # The task is retried anyway once its lease expires
+                logger.exception("Could not record the failure of task %d", task.id)
+        finally:
+            self._in_hand.pop(task.id, None)
+
+    async def run(self) -> None:
+        logger.info("Worker %s started with %d render processes, writing to %s",
+                    self.worker_id, self.processes, settings.album_output_root)
+        heartbeat = asyncio.create_task(self._heartbeat())
+        running: Set[asyncio.Task] = set()
+        with render_pool(self.processes) as pool:
+            try:
+                while not self._stopping.is_set():
+                    running = {t for t in running if not t.done()}
+                    free = self.processes - len(running)
+                    try:
+                        tasks = await self._claim(free) if free else []
+                    except Exception:
+                        logger.exception("Could not claim tasks; retrying after the poll interval")
+                        tasks = []
+                    for task in tasks:
+                        self._in_hand[task.id] = task
+                        running.add(asyncio.create_task(self._process(pool, task)))
+                    if tasks and len(running) < self.processes:
+                        continue
+                    # Wait for a render to finish, a stop request or the next poll, whichever is first
+                    stopping = asyncio.create_task(self._stopping.wait())
+                    done, _ = await asyncio.wait(
+                        running | {stopping}, timeout=settings.album_worker_poll_seconds,
+                        return_when=asyncio.FIRST_COMPLETED,
+                    )
+                    stopping.cancel()
+                    running -= done
+                if running:
+                    await asyncio.gather(*running)
+            finally:
+                heartbeat.cancel()
+        logger.info("Worker %s stopped", self.worker_id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processes", type=int, default=settings.album_workers or os.cpu_count() or 1)
+    parser.add_argument("--worker-id", default=f"{socket.gethostname()}:{os.getpid()}")
+    args = parser.parse_args()
+
+    setup_logging()
+    worker = RenderWorker(args.worker_id, args.processes)
+
+    async def serve():
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, worker.stop)
+            except NotImplementedError:
+                # Windows: Ctrl+C arrives as KeyboardInterrupt instead
+                pass
+        await worker.run()
+
+    asyncio.run(serve())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Compare peak memory of the two ways of loading a state's album data: ORM Student rows with
+selectinload(Student.school) (the old path) versus column-projected AlbumCandidate/AlbumSchool
+tuples from StudentRepository.find_album_candidates (the current path).
+
+    python scripts/bench_album_memory.py --students 120000 --per-school 60   # synthetic, no database
+    python scripts/bench_album_memory.py --state AB --batch 2025            # real rows from DATABASE_URL
+
+Synthetic mode builds the objects in memory, so it leaves out the Session identity map and
+result buffers and understates the ORM's cost. Database mode includes everything.
+"""
+import argparse
+import asyncio
+import gc
+import pickle
+import sys
+import time
+import tracemalloc
+import uuid
+from pathlib import Path
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.domain.models.album import AlbumCandidate, AlbumSchool
+from app.domain.models.school import School
+from app.domain.models.state import State  # noqa: F401  (registers the School.state relationship target)
+from app.domain.models.student import Student
+
+
+def measure(label: str, load):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    data = load()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<6} peak {peak / 2**20:8.1f} MiB   load {elapsed:6.2f}s")
+    return data
+
+
+def synthetic_orm(args):
+    students = []
+    for s in range(0, args.students, args.per_school):
+        school = School(id=uuid.uuid4(), schnum=f"{s:07d}", sch_name=f"SCHOOL {s}", town="TOWN",
+                        custodian="CUSTODIAN", state="ZZ", state_name="SYNTHETIC")
+        for i in range(s, min(s + args.per_school, args.students)):
+            students.append(Student(id=uuid.uuid4(), batch="2025", schnum=school.schnum, reg_no=f"{i:010d}AB",
+                                    ser_no=f"{i - s + 1:04d}", cand_name=f"CANDIDATE NAME {i}",
+                                    photo_path=f"media/photos/{i:010d}AB.jpg", school=school))
+    return students
+
+
+def synthetic_dto(args):
+    candidates, schools = [], {}
+    for s in range(0, args.students, args.per_school):
+        schnum = f"{s:07d}"
+        schools[schnum] = AlbumSchool(schnum, f"SCHOOL {s}", "TOWN", "CUSTODIAN", "ZZ", "SYNTHETIC")
+        for i in range(s, min(s + args.per_school, args.students)):
+            candidates.append(AlbumCandidate(f"{i:010d}AB", f"{i - s + 1:04d}", f"CANDIDATE NAME {i}",
+                                             f"media/photos/{i:010d}AB.jpg", schnum, "2025"))
+    return candidates, schools
+
+
+async def database_run(args):
+    from sqlalchemy import select
+    from sqlalchemy.orm import selectinload
+    from app.core.db import engine, async_session_maker
+    from app.infra.repositories.sqlalchemy_repositories import StudentRepository
+
+    async def orm():
+        async with async_session_maker() as session:
+            query = (
+                select(Student).options(selectinload(Student.school))
+                .join(School, School.schnum == Student.schnum)
+                .where(School.state == args.state)
+                .order_by(Student.schnum, Student.ser_no)
+            )
+            if args.batch:
+                query = query.where(Student.batch == args.batch)
+            return (await session.execute(query)).scalars().all()
+
+    async def dto():
+        async with async_session_maker() as session:
+            return await StudentRepository(session).find_album_candidates(args.state, args.batch)
+
+    # Run each load once unmeasured so connection setup and statement caching are not counted
+    await orm()
+    await dto()
+
+    async def measure_async(label: str, load):
+        gc.collect()
+        tracemalloc.start()
+        start = time.perf_counter()
+        data = await load()
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{label:<6} peak {peak / 2**20:8.1f} MiB   load {elapsed:6.2f}s")
+        return data
+
+    rows = await measure_async("orm", orm)
+    print(f"{len(rows):,} students in state {args.state}")
+    del rows
+    candidates, _ = await measure_async("dto", dto)
+    print(f"pickled candidates: {len(pickle.dumps(candidates)) / 2**20:.1f} MiB")
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=120_000)
+    parser.add_argument("--per-school", type=int, default=60)
+    parser.add_argument("--state", help="Measure real rows for this state code instead of synthetic ones")
+    parser.add_argument("--batch")
+    args = parser.parse_args()
+
+    if args.state:
+        asyncio.run(database_run(args))
+        return
+
+    print(f"{args.students:,} synthetic students, {args.per_school} per school")
+    students = measure("orm", lambda: synthetic_orm(args))
+    del students
+    candidates, _ = measure("dto", lambda: synthetic_dto(args))
+    print(f"pickled candidates: {len(pickle.dumps(candidates)) / 2**20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
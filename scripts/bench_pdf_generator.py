@@ -0,0 +1,130 @@
+"""
+Compare the canvas-based PDFGenerator behind /albums/generate with the platypus Table implementation
+it replaced (kept below as LegacyPDFGenerator):
+
+    python scripts/bench_pdf_generator.py --students 600 --layout grid_3x4 --repeat 3
+
+Synthetic students get generated JPEG photos (--photo-ratio of them), written once to a scratch directory.
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from PIL import Image as PILImage
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Image, Paragraph
+from app.domain.models.album import AlbumCandidate
+from app.infra.pdf.generator import PDFGenerator
+
+
+class LegacyPDFGenerator:
+    """The previous implementation: one platypus Table per grid, thumbnails written to /tmp."""
+
+    def __init__(self):
+        self.styles = getSampleStyleSheet()
+
+    def generate_album(self, students: List[AlbumCandidate], output_path: str, layout: str = "grid_3x4") -> str:
+        doc = SimpleDocTemplate(output_path, pagesize=A4)
+        story = []
+        cols, rows = map(int, layout.split('_')[1].split('x'))
+        students_per_page = cols * rows
+        for i in range(0, len(students), students_per_page):
+            batch = students[i:i + students_per_page]
+            table_data = []
+            for row in range(rows):
+                row_data = []
+                for col in range(cols):
+                    idx = row * cols + col
+                    row_data.append(self._create_student_cell(batch[idx]) if idx < len(batch) else "")
+                table_data.append(row_data)
+            table = Table(table_data, colWidths=[2*inch]*cols, rowHeights=[2.5*inch]*rows)
+            table.setStyle(TableStyle([
+                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+                ('GRID', (0, 0), (-1, -1), 1, colors.black),
+                ('FONTSIZE', (0, 0), (-1, -1), 8),
+            ]))
+            story.append(table)
+        doc.build(story)
+        return output_path
+
+    def _create_student_cell(self, student: AlbumCandidate) -> List:
+        content = []
+        if student.photo_path and Path(student.photo_path).exists():
+            try:
+                img = PILImage.open(student.photo_path)
+                img.thumbnail((120, 120))
+                temp_path = os.path.join(tempfile.gettempdir(), f"{student.reg_no}_thumb.jpg")
+                img.save(temp_path)
+                content.append(Image(temp_path, width=1.2*inch, height=1.2*inch))
+            except Exception:
+                content.append(Paragraph("No Photo", self.styles['Normal']))
+        else:
+            content.append(Paragraph("No Photo", self.styles['Normal']))
+        info = f"""
+        <b>{student.cand_name}</b><br/>
+        Reg: {student.reg_no}<br/>
+        Ser: {student.ser_no}
+        """
+        content.append(Paragraph(info, self.styles['Normal']))
+        return content
+
+
+def synthetic_students(count: int, photo_ratio: float, photo_dir: Path) -> List[AlbumCandidate]:
+    photos = max(1, int(count * photo_ratio)) if photo_ratio > 0 else 0
+    students = []
+    for i in range(count):
+        photo_path = None
+        if i < photos:
+            photo_path = photo_dir / f"{i:06d}.jpg"
+            PILImage.new("RGB", (400, 500), ((i * 37) % 256, (i * 91) % 256, 160)).save(photo_path, quality=85)
+        name = "NWANKWO DARLINGTON UDOCHUKWU" if i % 7 == 0 else f"CANDIDATE NAME {i}"
+        students.append(AlbumCandidate(f"2511{i:06d}AB", f"{i + 1:04d}", name,
+                                       str(photo_path) if photo_path else None, "0010017", "2025"))
+    return students
+
+
+def run(generator, students, layout: str, output: Path, repeat: int) -> List[float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        generator.generate_album(students, str(output), layout)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=600)
+    parser.add_argument("--layout", default="grid_3x4")
+    parser.add_argument("--photo-ratio", type=float, default=0.9)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        scratch = Path(scratch)
+        students = synthetic_students(args.students, args.photo_ratio, scratch)
+        print(f"{args.students} students, layout {args.layout}, {args.photo_ratio:.0%} with photos")
+        results = {}
+        for label, generator in (("legacy", LegacyPDFGenerator()), ("canvas", PDFGenerator())):
+            output = scratch / f"{label}.pdf"
+            timings = run(generator, students, args.layout, output, args.repeat)
+            results[label] = statistics.median(timings)
+            print(f"{label:<7} median {results[label]:7.3f}s   best {min(timings):7.3f}s   "
+                  f"{output.stat().st_size / 1024:8.0f} KiB")
+        print(f"speedup {results['legacy'] / results['canvas']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
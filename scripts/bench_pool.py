@@ -0,0 +1,77 @@
+"""
+Load-test connection pool sizing against the configured database. Each simulated request checks
+out a connection, runs a students page query and holds the connection for --hold-ms (standing in
+for the rest of the request), with --concurrency requests in flight at once:
+
+    python scripts/bench_pool.py --concurrency 100 --requests 2000 --pool-sizes 5,10,20,40
+
+Pick the smallest pool size whose p95 checkout wait is acceptable. Remember that every uvicorn
+worker gets its own pool: workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) must fit under max_connections.
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import select, func
+from app.core.config import settings
+from app.core.db import build_engine, pool_status
+from app.domain.models.student import Student
+
+QUERY = select(Student.id, Student.reg_no, Student.cand_name).order_by(Student.schnum, Student.ser_no).limit(50)
+
+
+async def run(pool_size: int, args) -> dict:
+    engine = build_engine(settings.database_url, echo=False, pool_size=pool_size,
+                          max_overflow=args.max_overflow, pool_timeout=args.timeout)
+    semaphore = asyncio.Semaphore(args.concurrency)
+    errors = 0
+
+    async def one_request():
+        nonlocal errors
+        async with semaphore:
+            try:
+                async with engine.connect() as connection:
+                    await connection.execute(QUERY)
+                    await asyncio.sleep(args.hold_ms / 1000)
+            except Exception:
+                errors += 1
+
+    # Warm up so connection setup is not counted as pool wait
+    async with engine.connect() as connection:
+        await connection.execute(select(func.count()).select_from(Student))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one_request() for _ in range(args.requests)))
+    elapsed = time.perf_counter() - start
+    status = pool_status(engine)
+    await engine.dispose()
+    return {"pool_size": pool_size, "elapsed": elapsed, "errors": errors, **status}
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pool-sizes", default="5,10,20,40")
+    parser.add_argument("--max-overflow", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--hold-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    print(f"{args.requests} requests, {args.concurrency} concurrent, hold {args.hold_ms} ms, "
+          f"max_overflow {args.max_overflow}")
+    print(f"{'pool':>5} {'req/s':>9} {'wait avg':>9} {'p50':>8} {'p95':>8} {'max':>8} {'timeouts':>9} {'errors':>7}")
+    for size in (int(s) for s in args.pool_sizes.split(",")):
+        r = await run(size, args)
+        print(f"{size:>5} {args.requests / r['elapsed']:>9.0f} {r['wait_ms_avg']:>8.1f}ms "
+              f"{r['wait_ms_p50']:>6.1f}ms {r['wait_ms_p95']:>6.1f}ms {r['wait_ms_max']:>6.1f}ms "
+              f"{r['timeouts']:>9} {r['errors']:>7}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
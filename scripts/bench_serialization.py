@@ -0,0 +1,111 @@
+"""
+Compare the default list_students serialization path (ORM object -> StudentRead.model_validate
+-> response_model validation -> JSON) with the fast path (projected tuples -> dict -> orjson).
+Runs on synthetic rows, no database needed:
+
+    python scripts/bench_serialization.py --rows 10000
+"""
+import argparse
+import json
+import sys
+import time
+import uuid
+from collections import namedtuple
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from pydantic import TypeAdapter
+from app.schemas.student_schema import StudentRead, PaginatedResponse
+from app.core.serialization import dumps
+
+READ_FIELDS = (
+    "id", "batch", "schnum", "sch_name", "reg_no", "ser_no", "cand_name", "school_id",
+    "photo_path", "created_at", "updated_at", "school_name", "state_name",
+)
+StudentRow = namedtuple("StudentRow", READ_FIELDS)
+
+
+class MockSchool:
+    def __init__(self, i):
+        self.sch_name = f"SCHOOL {i // 40}"
+        self.state_name = "ABIA"
+
+
+class MockStudent:
+    def __init__(self, i, now):
+        self.id = uuid.uuid4()
+        self.batch = "2025"
+        self.schnum = f"{i // 40:07d}"
+        self.sch_name = f"SCHOOL {i // 40}"
+        self.reg_no = f"2511{i:06d}AZ"
+        self.ser_no = f"{i % 40:04d}"
+        self.cand_name = f"CANDIDATE NAME {i}"
+        self.school_id = uuid.uuid4()
+        self.photo_path = None
+        self.created_at = now
+        self.updated_at = now
+        self.school = MockSchool(i)
+
+
+def model_path(students):
+    items = []
+    for student in students:
+        item = StudentRead.model_validate(student)
+        item.school_name = student.school.sch_name
+        item.state_name = student.school.state_name
+        item.photo_url = "/media/null_passport.jpg"
+        items.append(item)
+    response = PaginatedResponse(total=len(items), page=1, limit=len(items), items=items)
+    # What FastAPI does with response_model: validate again, dump to JSON-able data, json.dumps
+    adapter = TypeAdapter(PaginatedResponse)
+    validated = adapter.validate_python(response, from_attributes=True)
+    return json.dumps(adapter.dump_python(validated, mode="json")).encode("utf-8")
+
+
+def fast_path(rows):
+    items = []
+    for row in rows:
+        item = row._asdict()
+        item.pop("photo_path")
+        item["photo_url"] = "/media/null_passport.jpg"
+        items.append(item)
+    return dumps({"total": len(items), "page": 1, "limit": len(items), "items": items, "next_cursor": None})
+
+
+def timed(fn, arg, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = fn(arg)
+        best = min(best, time.perf_counter() - start)
+    return best, len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    now = datetime.now(timezone.utc)
+    students = [MockStudent(i, now) for i in range(args.rows)]
+    rows = [
+        StudentRow(s.id, s.batch, s.schnum, s.sch_name, s.reg_no, s.ser_no, s.cand_name, s.school_id,
+                   s.photo_path, s.created_at, s.updated_at, s.school.sch_name, s.school.state_name)
+        for s in students
+    ]
+
+    model_time, model_size = timed(model_path, students, args.repeat)
+    fast_time, fast_size = timed(fast_path, rows, args.repeat)
+
+    print(f"rows: {args.rows}, best of {args.repeat}")
+    print(f"  model_validate + response_model: {model_time * 1000:8.1f} ms  ({model_size:,} bytes)")
+    print(f"  projected tuples + orjson:       {fast_time * 1000:8.1f} ms  ({fast_size:,} bytes)")
+    print(f"  speedup: {model_time / fast_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+EXPLAIN every selective repository/album query and fail if the planner picks a sequential
+scan over a large table. Run against a migrated database:
+
+    python scripts/check_query_plans.py                 # use the data already loaded
+    python scripts/check_query_plans.py --seed 200000   # scratch DB: add synthetic rows first
+
+Seeded rows use state code ZZ and batch PLANCHECK and are removed afterwards unless --keep.
+Exits with status 1 when any query sequentially scans a table of at least --min-rows rows.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import uuid
+from pathlib import Path
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import select, delete, tuple_, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from app.core.db import engine, async_session_maker
+from app.domain.models.student import Student
+from app.domain.models.school import School
+from app.domain.models.state import State
+from app.domain.repositories.interfaces import StudentFilter
+from app.infra.repositories.sqlalchemy_repositories import StudentRepository
+
+SEED_STATE = "ZZ"
+SEED_BATCH = "PLANCHECK"
+STUDENTS_PER_SCHOOL = 40
+INSERT_CHUNK = 2000
+
+
+async def seed(session, total: int):
+    await session.execute(
+        pg_insert(State).values(code=SEED_STATE, state="PLAN CHECK", schools=0).on_conflict_do_nothing()
+    )
+    school_count = max(1, total // STUDENTS_PER_SCHOOL)
+    schools = [
+        {"id": uuid.uuid4(), "schnum": f"ZZ{i:07d}", "sch_name": f"PLAN CHECK SCHOOL {i}",
+         "state": SEED_STATE, "state_name": "PLAN CHECK"}
+        for i in range(school_count)
+    ]
+    for start in range(0, len(schools), INSERT_CHUNK):
+        await session.execute(pg_insert(School).values(schools[start:start + INSERT_CHUNK]))
+
+    rows = []
+    for i in range(total):
+        school = schools[i // STUDENTS_PER_SCHOOL % school_count]
+        rows.append({
+            "id": uuid.uuid4(), "batch": SEED_BATCH, "schnum": school["schnum"],
+            "sch_name": school["sch_name"], "reg_no": f"ZZ{i:010d}", "ser_no": f"{i % STUDENTS_PER_SCHOOL:04d}",
+            "cand_name": f"PLAN CHECK CANDIDATE {i}", "school_id": school["id"],
+        })
+        if len(rows) == INSERT_CHUNK:
+            await session.execute(pg_insert(Student).values(rows))
+            rows = []
+    if rows:
+        await session.execute(pg_insert(Student).values(rows))
+
+
+async def unseed(session):
+    await session.execute(delete(Student).where(Student.batch == SEED_BATCH))
+    await session.execute(delete(School).where(School.state == SEED_STATE))
+    await session.execute(delete(State).where(State.code == SEED_STATE))
+
+
+async def sample_values(session) -> dict:
+    """Real filter values, so the planner sees typical selectivity."""
+    row = (await session.execute(
+        select(Student.schnum, Student.batch, Student.reg_no, Student.ser_no, Student.id, School.state)
+        .join(School, Student.school_id == School.id)
+        .limit(1)
+    )).first()
+    if row is None:
+        raise SystemExit("No students with a school in the database; load data or pass --seed")
+    return row._asdict()
+
+
+def queries(repo: StudentRepository, v: dict):
+    keyset = (
+        repo._filtered_query(StudentFilter())
+        .where(tuple_(Student.schnum, Student.ser_no, Student.id) > tuple_(v["schnum"], v["ser_no"], v["id"]))
+        .order_by(Student.schnum, Student.ser_no, Student.id)
+        .limit(50)
+    )
+    return [
+        ("students list ?schnum=", repo._filtered_query(StudentFilter(schnum=v["schnum"]))
+            .order_by(Student.schnum, Student.ser_no, Student.id).limit(50)),
+        ("students list ?batch=&schnum=", repo._filtered_query(StudentFilter(schnum=v["schnum"], batch=v["batch"]))
+            .order_by(Student.schnum, Student.ser_no, Student.id).limit(50)),
+        ("students keyset page", keyset),
+        ("students by reg_no", select(Student).where(Student.reg_no == v["reg_no"])),
+        ("students by state", repo._by_state_query(v["state"], v["batch"])),
+        ("batches for state", select(Student.batch).distinct()
+            .join(School, Student.school_id == School.id, isouter=True)
+            .where(School.state == v["state"]).order_by(Student.batch)),
+        ("albums by state", repo._album_query(v["state"], v["batch"])),
+        ("albums by state, all batches", repo._album_query(v["state"])),
+        ("schools of state", select(School).where(School.state == v["state"]).order_by(School.schnum)),
+        ("export by school", select(Student.reg_no, Student.ser_no, Student.cand_name)
+            .where(Student.schnum == v["schnum"]).order_by(Student.schnum, Student.ser_no)),
+    ]
+
+
+def seq_scans(plan: dict):
+    if plan.get("Node Type") == "Seq Scan":
+        yield plan["Relation Name"]
+    for child in plan.get("Plans", []):
+        yield from seq_scans(child)
+
+
+async def table_sizes(connection) -> dict:
+    result = await connection.exec_driver_sql(
+        "SELECT relname, reltuples::bigint FROM pg_class WHERE relkind IN ('r', 'p') "
+        "AND relnamespace = 'public'::regnamespace"
+    )
+    sizes = dict(result.all())
+    # A partitioned parent has no rows of its own
+    partitions = await connection.exec_driver_sql(
+        "SELECT c.relname, p.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent"
+    )
+    for child, parent in partitions.all():
+        sizes[parent] = sizes.get(parent, 0) + max(sizes.get(child, 0), 0)
+    return sizes
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", type=int, default=0, help="insert this many synthetic students first")
+    parser.add_argument("--keep", action="store_true", help="keep seeded rows")
+    parser.add_argument("--min-rows", type=int, default=10000, help="tables smaller than this may be seq scanned")
+    args = parser.parse_args()
+
+    failures = 0
+    async with async_session_maker() as session:
+        if args.seed:
+            async with session.begin():
+                await seed(session, args.seed)
+        try:
+            async with session.begin():
+                await session.execute(text("ANALYZE students"))
+                await session.execute(text("ANALYZE schools"))
+            async with session.begin():
+                connection = await session.connection()
+                sizes = await table_sizes(connection)
+                values = await sample_values(session)
+                repo = StudentRepository(session)
+
+                for name, query in queries(repo, values):
+                    compiled = query.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True})
+                    result = await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}")
+                    plan = result.scalar()
+                    if isinstance(plan, str):
+                        plan = json.loads(plan)
+                    large = [r for r in seq_scans(plan[0]["Plan"]) if sizes.get(r, 0) >= args.min_rows]
+                    status = "FAIL" if large else "ok"
+                    failures += bool(large)
+                    detail = f"  seq scan on {', '.join(large)}" if large else ""
+                    print(f"{status:4}  {name}{detail}")
+        finally:
+            if args.seed and not args.keep:
+                async with session.begin():
+                    await unseed(session)
+    await engine.dispose()
+
+    print(f"\n{failures} of the checked queries scan a large table sequentially" if failures else "\nall plans ok")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())